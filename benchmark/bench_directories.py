@@ -0,0 +1,70 @@
+"""
+Threads and memory of the models and watchers, depending on the number of working directories loaded at once. All the
+watchers share a single observer, and all the models a single reload pool. Unless a backend is chosen, the native
+watcher is only used for a single directory, multiple directories are polled.
+
+Usage: python -m benchmark.bench_directories [--watcher {native,polling}]
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import threading
+import time
+import tracemalloc
+
+from contextlib import ExitStack
+
+from podap.config import Config
+from podap.model import Model, Watcher
+
+EXAMPLE_DIR = os.path.join(os.path.dirname(__file__), '..', 'example')
+COUNTS = (1, 2, 4, 8, 16, 32)
+
+
+def make_directories(root: str, count: int):
+    directories = []
+    for i in range(count):
+        directory = os.path.join(root, f'schedule-{i}')
+        shutil.copytree(EXAMPLE_DIR, directory)
+        directories.append(directory)
+    return directories
+
+
+def measure(directories) -> tuple:
+    threads_before = threading.active_count()
+    tracemalloc.start()
+    with ExitStack() as stack:
+        models = [Model(working_directory=x, load=False) for x in directories]
+        for model in models:
+            model.request_reload()
+            stack.enter_context(Watcher(model))
+
+        while not all(x.loaded for x in models):
+            time.sleep(0.01)
+
+        threads = threading.active_count() - threads_before
+        memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return threads, memory
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Threads and memory per number of working directories')
+    parser.add_argument('--watcher', '-w', type=str, default=None, choices=Config.WATCHER_BACKENDS)
+    args = parser.parse_args()
+
+    print(f'{"directories":>11} {"threads":>8} {"memory KiB":>11}')
+    for count in COUNTS:
+        with tempfile.TemporaryDirectory() as root:
+            directories = make_directories(root, count)
+            Config.INSTANCE = Config(working_directory=directories[0], pause_duration=15, pause_text='PAUSE',
+                                     borderless=False, watcher_backend=args.watcher,
+                                     working_directories=directories)
+            threads, memory = measure(directories)
+            print(f'{count:>11} {threads:>8} {memory / 1024:>11.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+Cost of the info panel (the day overview and the stats): construction time of the main window alone, time to open the
+panel, resident memory at each step, and the model subscriptions left behind once the panel is closed again.
+
+Requires PySide6, runs fine on the offscreen platform: QT_QPA_PLATFORM=offscreen python -m benchmark.bench_info_panel
+
+Usage: python -m benchmark.bench_info_panel [--cycles N]
+"""
+
+import argparse
+import os
+import resource
+import sys
+import tempfile
+import time
+
+from PySide6.QtCore import QSettings
+from PySide6.QtWidgets import QApplication
+
+from podap.config import Config
+from podap.model import Model
+
+EXAMPLE_DIR = os.path.join(os.path.dirname(__file__), '..', 'example')
+
+
+def rss_kib() -> int:
+    """ Current resident set size, falling back to the peak one where /proc is not available """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') // 1024
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cost of the info panel')
+    parser.add_argument('--cycles', '-c', type=int, default=20, help='Number of times to open and close the panel')
+    args = parser.parse_args()
+
+    # Keep the window geometry of the benchmark out of the user's settings
+    settings_dir = tempfile.TemporaryDirectory()
+    QSettings.setPath(QSettings.NativeFormat, QSettings.UserScope, settings_dir.name)
+    QSettings.setPath(QSettings.IniFormat, QSettings.UserScope, settings_dir.name)
+
+    Config.INSTANCE = Config(working_directory=EXAMPLE_DIR, pause_duration=15, pause_text='PAUSE', borderless=False)
+
+    app = QApplication(sys.argv[:1])
+    model = Model()
+
+    from podap.view.app import MainWindow
+
+    base_rss = rss_kib()
+    start = time.perf_counter()
+    window = MainWindow(model=model)
+    window.show()
+    app.processEvents()
+    window_time = time.perf_counter() - start
+    window_rss = rss_kib()
+    listeners = len(model.on_change_listeners)
+
+    start = time.perf_counter()
+    window.quick_access.on_info_click()
+    app.processEvents()
+    open_time = time.perf_counter() - start
+    open_rss = rss_kib()
+    open_listeners = len(model.on_change_listeners)
+    window.quick_access.on_info_click()
+    app.processEvents()
+
+    for _ in range(args.cycles):
+        window.quick_access.on_info_click()
+        app.processEvents()
+        window.quick_access.on_info_click()
+        app.processEvents()
+
+    print(f'main window:     {window_time * 1000:8.1f} ms {window_rss - base_rss:8} KiB  {listeners} model listeners')
+    print(f'open info panel: {open_time * 1000:8.1f} ms {open_rss - window_rss:8} KiB  '
+          f'{open_listeners} model listeners')
+    print(f'after {args.cycles} open/close cycles: {rss_kib() - open_rss:+} KiB, '
+          f'{len(model.on_change_listeners)} model listeners')
+
+    window.close()
+    settings_dir.cleanup()
+
+
+if __name__ == '__main__':
+    main()
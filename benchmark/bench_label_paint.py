@@ -0,0 +1,75 @@
+"""
+Cost of repainting a ScalableLabel without any change of its text or size (e.g.: blinking, or moving the window): the
+cached rendered text against laying out the text on every paint, as QLabel.paintEvent does.
+
+Requires PySide6, runs fine on the offscreen platform: QT_QPA_PLATFORM=offscreen python -m benchmark.bench_label_paint
+
+Usage: python -m benchmark.bench_label_paint [--repaints N]
+"""
+
+import argparse
+import sys
+
+from PySide6.QtGui import QColor, QPaintEvent, QPalette
+from PySide6.QtWidgets import QApplication, QLabel
+
+from podap.stats import Stats
+from podap.view.scalable_label import ScalableLabel
+
+TEXTS = ('Work', 'Read books and take some notes about them', 'Next: Wind down 21:59:59')
+
+
+class QLabelPaintLabel(ScalableLabel):
+    """ Reference implementation: fits the font the same way, but paints through QLabel every time """
+
+    def _paint(self, event: QPaintEvent):
+        if self.should_redraw:
+            new_font = self.font()
+            new_font.setPointSizeF(self.get_maximum_font_size())
+            self.setFont(new_font)
+            self.should_redraw = False
+
+        QLabel.paintEvent(self, event)
+
+
+def measure(app: QApplication, label: ScalableLabel, repaints: int) -> float:
+    palettes = [QPalette(label.palette()), QPalette(label.palette())]
+    palettes[1].setColor(QPalette.Window, QColor.fromRgb(0xDC322F))
+    label.setAutoFillBackground(True)
+    label.show()
+    app.processEvents()
+
+    # Only count the time spent in the label's own painting, not the background fill and the flushing to the screen
+    Stats.INSTANCE = Stats(enabled=True)
+    for i in range(repaints):
+        # Same as the blinking, only the colors change
+        label.setPalette(palettes[i % 2])
+        label.repaint()
+
+    histogram = Stats.INSTANCE.histograms['label.paint_ms']
+    return histogram.total / histogram.count / 1000.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='ScalableLabel repaint cost')
+    parser.add_argument('--repaints', '-r', type=int, default=2000)
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv[:1])
+
+    print(f'{"text":<44} {"QLabel":>10} {"cached":>10} {"speedup":>8}')
+    for text in TEXTS:
+        results = []
+        for cls in (QLabelPaintLabel, ScalableLabel):
+            label = cls(text)
+            label.set_starting_font_size(40)
+            label.resize(400, 120)
+            results.append(measure(app, label, args.repaints))
+            label.close()
+
+        reference, cached = results
+        print(f'{text:<44} {reference * 1e6:>7.1f} us {cached * 1e6:>7.1f} us {reference / cached:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""
+Compare the cost of a task lookup via linear scan over the day entries (the original implementation) with a lookup
+via bisection of the compiled day timeline.
+
+Usage: python -m benchmark.bench_lookup
+"""
+
+import os
+import tempfile
+import timeit
+
+from podap.config import Config
+from podap.model import Model, DayEntry, DayOfWeek, HourEntry
+
+EXAMPLE_DIR = os.path.join(os.path.dirname(__file__), '..', 'example')
+NUMBER = 20000
+
+
+def linear_lookup(model: Model, day: DayOfWeek, hour: int) -> HourEntry:
+    """ Reference implementation: the lookup as it was done before the timelines existed """
+    day = DayOfWeek.from_number(day.value[0])
+    for entry in model.days[day].entries:
+        if entry.is_active(hour):
+            return entry
+    raise ValueError('not found')
+
+
+def make_pathological_directory(path: str, entries_per_day: int):
+    """ Every day has a lot of entries for the early hours, and the late hours are at the very end of the file """
+    for number, day in enumerate(DayOfWeek):
+        entries = [HourEntry(start_hour=i % 12, title=f'Task {i}') for i in range(entries_per_day)]
+        entries += [HourEntry(start_hour=i, title=f'Late {i}') for i in range(12, 24)]
+        with open(os.path.join(path, f'{number}_{str(day).lower()}.txt'), 'w') as f:
+            f.write(str(DayEntry(day_of_week=day, entries=entries)))
+
+
+def run(name: str, working_directory: str):
+    Config.INSTANCE = Config(working_directory=working_directory, pause_duration=15, pause_text='PAUSE',
+                             borderless=False)
+    model = Model()
+
+    day, hour = DayOfWeek.Friday, 23
+    linear = timeit.timeit(lambda: linear_lookup(model, day, hour), number=NUMBER) / NUMBER
+    timeline = timeit.timeit(lambda: model.get_for_day_and_time(day, hour, 5), number=NUMBER) / NUMBER
+
+    print(f'{name:>14}: linear {linear * 1e6:9.3f} us, timeline {timeline * 1e6:7.3f} us, '
+          f'speedup x{linear / timeline:.1f}')
+
+
+def main():
+    run('realistic', EXAMPLE_DIR)
+
+    for entries_per_day in (100, 1000, 10000):
+        with tempfile.TemporaryDirectory() as path:
+            make_pathological_directory(path, entries_per_day)
+            run(f'{entries_per_day} entries', path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+Memory footprint and allocation counts of parsed schedules, measured with tracemalloc: the original dict-backed
+entries with one title string per occurrence against the slotted entries with interned titles.
+
+Usage: python -m benchmark.bench_memory
+"""
+
+import tracemalloc
+
+from typing import Callable, List
+
+from podap.model import DayEntry, DayOfWeek
+
+from benchmark import generators
+
+WEEKS = (1, 52, 520)
+
+
+class DictHourEntry:
+    """ Reference implementation: the entry as it was before slots and interning """
+
+    def __init__(self, start_hour: int, title: str, duration: int = 1):
+        self.start_hour = start_hour
+        self.duration = duration
+        self.end_hour = self.start_hour + self.duration
+        self.title = title
+
+
+class DictDayEntry:
+    def __init__(self, day_of_week: DayOfWeek, entries: list):
+        self.day_of_week = day_of_week
+        self.entries = entries
+
+
+def dict_parse(day_of_week: DayOfWeek, text: str) -> DictDayEntry:
+    entries = []
+    for chunk in text.split('\n\n'):
+        title, time = chunk.split('\n')
+        entries.append(DictHourEntry(start_hour=int(time.split(':')[0]), title=title))
+    return DictDayEntry(day_of_week, entries)
+
+
+def slotted_parse(day_of_week: DayOfWeek, text: str) -> DayEntry:
+    return DayEntry.parse(day_of_week, text)
+
+
+def measure(parse: Callable[[DayOfWeek, str], object], texts: List[str]):
+    tracemalloc.start()
+    try:
+        days = [parse(DayOfWeek.from_number(i % 7), x) for i, x in enumerate(texts)]
+        snapshot = tracemalloc.take_snapshot()
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    blocks = sum(x.count for x in snapshot.statistics('filename'))
+    del days
+    return size, blocks
+
+
+def main():
+    for weeks in WEEKS:
+        texts = [str(generators.make_day(DayOfWeek.from_number(i % 7), seed=i)) for i in range(weeks * 7)]
+        entries = weeks * 7 * 24
+
+        dict_size, dict_blocks = measure(dict_parse, texts)
+        slotted_size, slotted_blocks = measure(slotted_parse, texts)
+
+        print(f'{weeks:>4} weeks ({entries:>6} entries): '
+              f'dict {dict_size / entries:6.1f} B/entry, {dict_blocks:>7} blocks; '
+              f'slotted {slotted_size / entries:6.1f} B/entry, {slotted_blocks:>7} blocks')
+
+
+if __name__ == '__main__':
+    main()
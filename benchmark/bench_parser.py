@@ -0,0 +1,51 @@
+"""
+Parser throughput on multi-thousand-entry days: the original split-based parser against the single-pass tokenizer.
+
+Usage: python -m benchmark.bench_parser
+"""
+
+import timeit
+
+from podap.model import DayEntry, DayOfWeek, HourEntry
+
+from benchmark import generators
+
+REPEAT = 5
+
+
+def split_parse(text: str) -> DayEntry:
+    """ Reference implementation: the parser as it was before the tokenizer existed """
+    entries = []
+    for chunk in text.split('\n\n'):
+        parts = chunk.split('\n')
+        if len(parts) != 2:
+            raise ValueError(chunk)
+        time = parts[1].split(':')
+        if len(time) != 2:
+            raise ValueError(chunk)
+        entries.append(HourEntry(start_hour=int(time[0]), title=parts[0]))
+    return DayEntry(day_of_week=DayOfWeek.Monday, entries=entries)
+
+
+def measure(statement) -> float:
+    number = 1
+    while timeit.timeit(statement, number=number) < 0.2:
+        number *= 2
+    return min(timeit.repeat(statement, number=number, repeat=REPEAT)) / number
+
+
+def main():
+    for entries in (1000, 5000, 20000):
+        text = generators.day_text(entries)
+        megabytes = len(text.encode()) / 1e6
+
+        split = measure(lambda: split_parse(text))
+        tokenized = measure(lambda: DayEntry.parse(DayOfWeek.Monday, text))
+
+        print(f'{entries:>6} entries ({megabytes:.2f} MB): '
+              f'split {entries / split / 1e3:8.1f} k entries/s ({megabytes / split:6.2f} MB/s), '
+              f'tokenizer {entries / tokenized / 1e3:8.1f} k entries/s ({megabytes / tokenized:6.2f} MB/s)')
+
+
+if __name__ == '__main__':
+    main()
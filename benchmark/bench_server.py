@@ -0,0 +1,79 @@
+"""
+Load test of the query server: a number of concurrent clients, each sending a series of requests over its own
+connection and waiting for each response before sending the next request. Reports the latency percentiles and the
+overall throughput.
+
+The server runs in this very process, on its own thread, same as in the app.
+
+Usage: python -m benchmark.bench_server [--clients N] [--requests N] [--command {current,next,day,hash}]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+from typing import List
+
+from podap.config import Config
+from podap.model import Model
+from podap.server import QueryServer
+
+EXAMPLE_DIR = os.path.join(os.path.dirname(__file__), '..', 'example')
+
+
+async def client(path: str, command: bytes, requests: int, latencies: List[float]):
+    reader, writer = await asyncio.open_unix_connection(path)
+    try:
+        for _ in range(requests):
+            start = time.perf_counter()
+            writer.write(command)
+            await writer.drain()
+            response = await reader.readline()
+            latencies.append(time.perf_counter() - start)
+            if b'"error"' in response:
+                raise RuntimeError(f'Unexpected response: {response.decode().strip()}')
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+async def load(path: str, command: str, clients: int, requests: int) -> List[float]:
+    latencies = []  # type: List[float]
+    data = f'{command}\n'.encode()
+    await asyncio.gather(*(client(path, data, requests, latencies) for _ in range(clients)))
+    return latencies
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    return values[min(int(fraction * len(values)), len(values) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Query server load test')
+    parser.add_argument('--clients', '-c', type=int, default=50, help='Number of concurrent connections')
+    parser.add_argument('--requests', '-r', type=int, default=200, help='Requests per connection')
+    parser.add_argument('--command', type=str, default='current', choices=['current', 'next', 'day', 'hash'])
+    args = parser.parse_args()
+
+    Config.INSTANCE = Config(working_directory=EXAMPLE_DIR, pause_duration=15, pause_text='PAUSE', borderless=False)
+    model = Model()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'podap.sock')
+        with QueryServer(model, path):
+            start = time.perf_counter()
+            latencies = asyncio.run(load(path, args.command, args.clients, args.requests))
+            elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    print(f'{len(latencies)} requests from {args.clients} clients in {elapsed:.2f} s '
+          f'({len(latencies) / elapsed:.0f} requests/s)')
+    print(f'latency: p50 {percentile(latencies, 0.5) * 1e3:.3f} ms, p99 {percentile(latencies, 0.99) * 1e3:.3f} ms, '
+          f'mean {statistics.mean(latencies) * 1e3:.3f} ms, max {latencies[-1] * 1e3:.3f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""
+Timer wakeups and paints of the main window per hour, in each of its visibility states: expanded, with the task pane
+collapsed and minimized. Each state is observed for a few seconds and the counts are extrapolated to an hour.
+
+Requires PySide6, runs fine on the offscreen platform: QT_QPA_PLATFORM=offscreen python -m benchmark.bench_wakeups
+
+Usage: python -m benchmark.bench_wakeups [--duration SECONDS] [--clock {inline,separate,none}]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+
+from PySide6.QtCore import QEvent, QObject, QSettings, QTimer
+from PySide6.QtWidgets import QApplication
+
+from podap.config import Config
+from podap.model import Model
+
+EXAMPLE_DIR = os.path.join(os.path.dirname(__file__), '..', 'example')
+
+
+class EventCounter(QObject):
+    """ Application-wide event filter, counting the timer and paint events """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.timers = 0
+        self.paints = 0
+
+    def reset(self):
+        self.timers = 0
+        self.paints = 0
+
+    def eventFilter(self, watched: QObject, event: QEvent) -> bool:
+        if event.type() == QEvent.Timer:
+            self.timers += 1
+        elif event.type() == QEvent.Paint:
+            self.paints += 1
+        return False
+
+
+def observe(app: QApplication, counter: EventCounter, seconds: float):
+    # Let the state change settle before counting
+    QTimer.singleShot(100, app.quit)
+    app.exec()
+
+    counter.reset()
+    QTimer.singleShot(int(seconds * 1000), app.quit)
+    app.exec()
+
+    # Not counting the timer ending the observation
+    per_hour = 3600.0 / seconds
+    return (counter.timers - 1) * per_hour, counter.paints * per_hour
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Main window wakeups per hour')
+    parser.add_argument('--duration', '-d', type=float, default=5.0, help='Observation time per state, in seconds')
+    parser.add_argument('--clock', '-c', type=str, default=Config.CLOCK_INLINE, choices=Config.CLOCK_MODES)
+    args = parser.parse_args()
+
+    # Keep the window geometry of the benchmark out of the user's settings
+    settings_dir = tempfile.TemporaryDirectory()
+    QSettings.setPath(QSettings.NativeFormat, QSettings.UserScope, settings_dir.name)
+    QSettings.setPath(QSettings.IniFormat, QSettings.UserScope, settings_dir.name)
+
+    Config.INSTANCE = Config(working_directory=EXAMPLE_DIR, pause_duration=15, pause_text='PAUSE', borderless=False,
+                             clock_mode=args.clock)
+
+    app = QApplication(sys.argv[:1])
+    counter = EventCounter()
+    app.installEventFilter(counter)
+
+    from podap.view.app import MainWindow
+    window = MainWindow(model=Model())
+    window.show()
+
+    def expand():
+        window.showNormal()
+        if window.collapsed:
+            window.quick_access.on_hide_click()
+
+    def collapse():
+        if not window.collapsed:
+            window.quick_access.on_hide_click()
+
+    states = [('expanded', expand), ('collapsed', collapse), ('minimized', window.showMinimized),
+              ('expanded again', expand)]
+
+    print(f'{"state":<16} {"wakeups/h":>10} {"paints/h":>10}')
+    for name, enter in states:
+        enter()
+        timers, paints = observe(app, counter, args.duration)
+        print(f'{name:<16} {timers:>10.0f} {paints:>10.0f}')
+
+    settings_dir.cleanup()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""
+Synthetic schedule generators for the benchmarks.
+
+All the generators write into an existing (usually temporary) directory, using the same file layout as the `example`
+directory: one `<day number>_<day name>.txt` file per day of week, optionally with dated days on top.
+"""
+
+import os
+import random
+
+from datetime import date, timedelta
+
+from podap.model import DayEntry, DayOfWeek, HourEntry
+
+TITLES = ['Email', 'Work', 'Meeting', 'Review', 'Lunch', 'Read books', 'Sleep', 'Exercise', 'Wind down']
+
+
+def _write_day(directory: str, name: str, day: DayEntry):
+    with open(os.path.join(directory, name), 'w') as f:
+        f.write(str(day))
+
+
+def _file_name(day_of_week: DayOfWeek, suffix: str = '') -> str:
+    return f'{day_of_week.value[0]}_{str(day_of_week).lower()}{suffix}.txt'
+
+
+def make_day(day_of_week: DayOfWeek, entries_per_day: int = 24, seed: int = 0) -> DayEntry:
+    """ A day with the given number of entries, repeating the 24 hours if there are more than 24 entries """
+    rng = random.Random(seed + day_of_week.value[0])
+    entries = [HourEntry(start_hour=i % 24, title=rng.choice(TITLES)) for i in range(entries_per_day)]
+    return DayEntry(day_of_week=day_of_week, entries=entries)
+
+
+def normal_week(directory: str):
+    """ Seven days with one entry per hour """
+    for day_of_week in DayOfWeek:
+        _write_day(directory, _file_name(day_of_week), make_day(day_of_week))
+
+
+def many_entry_week(directory: str, entries_per_day: int):
+    """ Seven days, each with a lot of entries, most of which are shadowed by the earlier ones """
+    for day_of_week in DayOfWeek:
+        _write_day(directory, _file_name(day_of_week), make_day(day_of_week, entries_per_day))
+
+
+def large_directory(directory: str, num_schedule_files: int, num_other_files: int):
+    """
+    A normal week plus a lot of additional schedule files (spread over the days of week, the last one wins) and a lot
+    of unrelated files, which have to be filtered out while scanning the directory.
+    """
+    normal_week(directory)
+
+    days = list(DayOfWeek)
+    for i in range(num_schedule_files):
+        day_of_week = days[i % len(days)]
+        _write_day(directory, _file_name(day_of_week, f'{i:05}'), make_day(day_of_week, seed=i))
+
+    for i in range(num_other_files):
+        with open(os.path.join(directory, f'notes_{i:05}.md'), 'w') as f:
+            f.write('Not a schedule\n')
+
+
+def hour_entry_text(seed: int = 0) -> str:
+    rng = random.Random(seed)
+    return str(HourEntry(start_hour=rng.randrange(24), title=rng.choice(TITLES)))
+
+
+def day_text(entries_per_day: int = 24) -> str:
+    return str(make_day(DayOfWeek.Monday, entries_per_day))
+
+
+def dated_year(directory: str, num_dated_days: int, first: date = date(2024, 1, 1)):
+    """
+    A normal week plus a lot of dated days: single days spread over the following years, and a few longer ranges
+    overlapping them.
+    """
+    normal_week(directory)
+
+    for i in range(num_dated_days):
+        day = first + timedelta(days=2 * i)
+        if i % 10 == 0:
+            name = f'{day.isoformat()}..{(day + timedelta(days=13)).isoformat()}_range{i:05}.txt'
+        else:
+            name = f'{day.isoformat()}_day{i:05}.txt'
+        _write_day(directory, name, make_day(DayOfWeek.from_date_time(day), seed=i))
@@ -0,0 +1,115 @@
+"""
+Run the micro-benchmark suite, optionally storing the results as JSON and comparing them against a baseline.
+
+Usage:
+    python -m benchmark.run --output results.json
+    python -m benchmark.run --baseline results.json --threshold 1.25
+"""
+
+import argparse
+import fnmatch
+import json
+import platform
+import statistics
+import sys
+import timeit
+
+from contextlib import ExitStack
+from datetime import datetime
+from typing import Dict, Optional
+
+from benchmark.suite import BENCHMARKS, Benchmark
+
+FORMAT_VERSION = 1
+
+
+def measure(bench: Benchmark, repeat: int, min_time: float) -> Dict[str, float]:
+    with ExitStack() as stack:
+        statement = bench.setup(stack)
+        timer = timeit.Timer(statement)
+
+        # Find the number of loops taking at least min_time, just like `python -m timeit` does
+        number = 1
+        while True:
+            if timer.timeit(number) >= min_time:
+                break
+            number *= 2
+
+        times = [x / number for x in timer.repeat(repeat=repeat, number=number)]
+
+    return {
+        'min_us': min(times) * 1e6,
+        'median_us': statistics.median(times) * 1e6,
+        'number': number,
+        'repeat': repeat,
+    }
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], threshold: float) -> bool:
+    """ Print the comparison against the baseline. Returns False if any benchmark regressed by more than threshold """
+    ok = True
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            print(f'{name:<55} {result["min_us"]:12.3f} us       (new)')
+            continue
+
+        ratio = result['min_us'] / reference['min_us']
+        regressed = ratio > threshold
+        ok = ok and not regressed
+        marker = 'REGRESSION' if regressed else ''
+        print(f'{name:<55} {result["min_us"]:12.3f} us  x{ratio:6.2f} {marker}')
+
+    return ok
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description='podap micro-benchmarks')
+    parser.add_argument('--output', '-o', type=str, required=False, default=None,
+                        help='Store the results as JSON')
+    parser.add_argument('--baseline', '-b', type=str, required=False, default=None,
+                        help='Compare the results against a JSON file produced by --output')
+    parser.add_argument('--threshold', '-t', type=float, required=False, default=1.25,
+                        help='Slowdown ratio against the baseline considered a regression')
+    parser.add_argument('--filter', '-f', type=str, required=False, default='*',
+                        help='Only run benchmarks with matching names (fnmatch pattern)')
+    parser.add_argument('--repeat', '-r', type=int, required=False, default=5)
+    parser.add_argument('--min-time', type=float, required=False, default=0.2,
+                        help='Minimum duration, in seconds, of a single timing run')
+    args = parser.parse_args(argv)
+
+    results = {}
+    for bench in BENCHMARKS:
+        if not fnmatch.fnmatch(bench.name, args.filter):
+            continue
+
+        results[bench.name] = measure(bench, args.repeat, args.min_time)
+        if args.baseline is None:
+            print(f'{bench.name:<55} {results[bench.name]["min_us"]:12.3f} us')
+
+    ok = True
+    if args.baseline is not None:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+
+        if baseline.get('version') != FORMAT_VERSION:
+            print(f'Unsupported baseline format: {baseline.get("version")}', file=sys.stderr)
+            return 2
+
+        ok = compare(results, baseline['results'], args.threshold)
+
+    if args.output is not None:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'version': FORMAT_VERSION,
+                'created': datetime.now().isoformat(),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'results': results,
+            }, f, indent=2)
+
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
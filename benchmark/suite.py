@@ -0,0 +1,174 @@
+"""
+Micro-benchmarks for the model and parser hot paths.
+
+Each benchmark is a setup function, receiving an ExitStack for its cleanup and returning the statement to be timed.
+"""
+
+import os
+import tempfile
+
+from contextlib import ExitStack
+from datetime import datetime, timedelta
+from typing import Callable, List
+
+from podap.config import Config
+from podap.model import DayEntry, DayOfWeek, HourEntry, Model, ParseCache
+from podap.model.tokenizer import tokenize
+
+from benchmark import generators
+
+Statement = Callable[[], object]
+
+
+class Benchmark:
+    def __init__(self, name: str, setup: Callable[[ExitStack], Statement]):
+        self.name = name
+        self.setup = setup
+
+
+BENCHMARKS = []  # type: List[Benchmark]
+
+
+def benchmark(name: str):
+    def decorator(setup: Callable[[ExitStack], Statement]):
+        BENCHMARKS.append(Benchmark(name, setup))
+        return setup
+
+    return decorator
+
+
+def make_model(stack: ExitStack, generator: Callable[[str], None]) -> Model:
+    """ Generate a working directory, and load a model from it """
+    directory = stack.enter_context(tempfile.TemporaryDirectory())
+    generator(directory)
+
+    previous_config = Config.INSTANCE
+    stack.callback(setattr, Config, 'INSTANCE', previous_config)
+    Config.INSTANCE = Config(working_directory=directory, pause_duration=15, pause_text='PAUSE', borderless=False)
+
+    return Model()
+
+
+@benchmark('HourEntry.parse')
+def hour_entry_parse(_: ExitStack) -> Statement:
+    text = generators.hour_entry_text()
+    return lambda: HourEntry.parse(text)
+
+
+@benchmark('DayEntry.parse[24]')
+def day_entry_parse(_: ExitStack) -> Statement:
+    text = generators.day_text()
+    return lambda: DayEntry.parse(DayOfWeek.Monday, text)
+
+
+@benchmark('DayEntry.parse[5000]')
+def day_entry_parse_many(_: ExitStack) -> Statement:
+    text = generators.day_text(5000)
+    return lambda: DayEntry.parse(DayOfWeek.Monday, text)
+
+
+@benchmark('tokenize[5000]')
+def tokenize_many(_: ExitStack) -> Statement:
+    text = generators.day_text(5000)
+    return lambda: list(tokenize(text))
+
+
+@benchmark('tokenize[5000, CRLF and extra blank lines]')
+def tokenize_many_irregular(_: ExitStack) -> Statement:
+    text = generators.day_text(5000).replace('\n\n', '\n  \n\n').replace('\n', '\r\n')
+    return lambda: list(tokenize(text))
+
+
+@benchmark('DayEntry.__str__[24]')
+def day_entry_str(_: ExitStack) -> Statement:
+    day = generators.make_day(DayOfWeek.Monday)
+    return lambda: str(day)
+
+
+@benchmark('DayEntry.__str__[5000]')
+def day_entry_str_many(_: ExitStack) -> Statement:
+    day = generators.make_day(DayOfWeek.Monday, 5000)
+    return lambda: str(day)
+
+
+@benchmark('Model()[normal week]')
+def model_load(stack: ExitStack) -> Statement:
+    make_model(stack, generators.normal_week)
+    return Model
+
+
+@benchmark('Model()[1000 entries per day]')
+def model_load_many(stack: ExitStack) -> Statement:
+    make_model(stack, lambda x: generators.many_entry_week(x, 1000))
+    return Model
+
+
+@benchmark('Model()[large directory]')
+def model_load_large(stack: ExitStack) -> Statement:
+    make_model(stack, lambda x: generators.large_directory(x, 500, 2000))
+    return Model
+
+
+@benchmark('Model()[large directory, warm parse cache]')
+def model_load_cached(stack: ExitStack) -> Statement:
+    make_model(stack, lambda x: generators.large_directory(x, 500, 2000))
+    cache_path = os.path.join(stack.enter_context(tempfile.TemporaryDirectory()), 'cache.bin')
+    Model(cache=ParseCache(cache_path))
+    return lambda: Model(cache=ParseCache(cache_path))
+
+
+@benchmark('Model.reload[normal week, unchanged]')
+def model_reload(stack: ExitStack) -> Statement:
+    return make_model(stack, generators.normal_week).reload
+
+
+@benchmark('Model.reload[large directory, unchanged]')
+def model_reload_large(stack: ExitStack) -> Statement:
+    return make_model(stack, lambda x: generators.large_directory(x, 500, 2000)).reload
+
+
+@benchmark('Model.reload[normal week, one file changed]')
+def model_reload_changed(stack: ExitStack) -> Statement:
+    model = make_model(stack, generators.normal_week)
+    path = model.days[DayOfWeek.Monday].path
+    texts = [str(generators.make_day(DayOfWeek.Monday, seed=x)) for x in (1, 2)]
+    state = {'flip': 0}
+
+    def statement():
+        state['flip'] ^= 1
+        with open(path, 'w') as f:
+            f.write(texts[state['flip']])
+        model.reload()
+
+    return statement
+
+
+@benchmark('Model.get_for_day_and_time')
+def model_get_for_day_and_time(stack: ExitStack) -> Statement:
+    model = make_model(stack, generators.normal_week)
+    return lambda: model.get_for_day_and_time(DayOfWeek.Friday, 23, 5)
+
+
+@benchmark('Model.get_for_day_and_time[1000 entries per day]')
+def model_get_for_day_and_time_many(stack: ExitStack) -> Statement:
+    model = make_model(stack, lambda x: generators.many_entry_week(x, 1000))
+    return lambda: model.get_for_day_and_time(DayOfWeek.Friday, 23, 5)
+
+
+@benchmark('Model.get_for_date')
+def model_get_for_date(stack: ExitStack) -> Statement:
+    model = make_model(stack, generators.normal_week)
+    date = datetime.now().replace(minute=5) + timedelta(hours=1)
+    return lambda: model.get_for_date(date)
+
+
+@benchmark('Model.get_for_date[5000 dated days]')
+def model_get_for_date_dated(stack: ExitStack) -> Statement:
+    model = make_model(stack, lambda x: generators.dated_year(x, 5000))
+    date = datetime(2030, 6, 3, 10, 5)
+    return lambda: model.get_for_date(date)
+
+
+@benchmark('Model.get_pending_task')
+def model_get_pending_task(stack: ExitStack) -> Statement:
+    return make_model(stack, generators.normal_week).get_pending_task
@@ -0,0 +1,69 @@
+import atexit
+import sys
+
+from datetime import date
+
+from podap.config import Config
+from podap.stats import Stats
+from podap.startup_profiler import StartupProfiler
+
+
+def check_schedule() -> int:
+    """ Load the schedules without starting the GUI, reporting any errors """
+    directories = Config.INSTANCE.working_directories
+    result = 0
+    for directory in directories:
+        if len(directories) > 1:
+            print(f'{directory}:')
+        result = max(result, check_directory(directory))
+    return result
+
+
+def check_directory(working_directory: str) -> int:
+    from podap.model import Model
+
+    try:
+        model = Model(working_directory=working_directory)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+
+    for day_of_week, day in sorted(model.days.items(), key=lambda x: x[0].value[0]):
+        print(f'{day_of_week.name:<10} {len(day.entries):4} entries  {day.path}')
+
+    calendar = model.schedule.calendar
+    if calendar.period != 0:
+        print(f'{calendar.period} rotated weeks, {len(calendar.rotation)} rotated days')
+    if len(calendar.starts) != 0:
+        print(f'{len(calendar.starts)} dated intervals, '
+              f'from {date.fromordinal(calendar.starts[0])} until {date.fromordinal(calendar.ends[-1] - 1)}')
+    return 0
+
+
+def main() -> int:
+    # Note: the GUI (and thus PySide6) is only imported once we know that it is actually needed
+    profiler = StartupProfiler()
+
+    Config.INSTANCE = Config.from_args()
+    if Config.INSTANCE.stats or Stats.enabled_by_environment():
+        Stats.INSTANCE.enabled = True
+        atexit.register(Stats.INSTANCE.dump, Config.INSTANCE.stats_output)
+
+    if Config.INSTANCE.check:
+        return check_schedule()
+
+    if Config.INSTANCE.headless:
+        from podap.headless import HeadlessApp
+        return HeadlessApp.run()
+
+    if not Config.INSTANCE.profile_startup:
+        profiler = None
+
+    if profiler is None:
+        from podap.view.app import PodapApp
+    else:
+        with profiler.phase('GUI imports'):
+            from podap.view.app import PodapApp
+
+    PodapApp.run(profiler)
+    return 0
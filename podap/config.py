@@ -1,17 +1,57 @@
 import argparse
 import os
 import sys
-from typing import Optional
+from datetime import date
+from typing import List, Optional
 
 
 class Config:
     INSTANCE = None  # type: Optional['Config']
 
-    def __init__(self, working_directory: str, pause_duration: int, pause_text: str, borderless: bool):
+    CLOCK_INLINE = 'inline'
+    CLOCK_SEPARATE = 'separate'
+    CLOCK_NONE = 'none'
+    CLOCK_MODES = [CLOCK_INLINE, CLOCK_SEPARATE, CLOCK_NONE]
+
+    WATCHER_NATIVE = 'native'
+    WATCHER_POLLING = 'polling'
+    WATCHER_BACKENDS = [WATCHER_NATIVE, WATCHER_POLLING]
+
+    def __init__(self, working_directory: str, pause_duration: int, pause_text: str, borderless: bool,
+                 reload_delay: int = 300, clock_mode: str = CLOCK_INLINE, check: bool = False,
+                 profile_startup: bool = False, rotation_anchor: Optional[date] = None,
+                 watcher_backend: Optional[str] = None, poll_interval: int = 2000, stats: bool = False,
+                 stats_output: Optional[str] = None, work_duration: Optional[int] = None,
+                 long_break_duration: int = 0, long_break_every: int = 0, headless: bool = False,
+                 socket_path: Optional[str] = None, working_directories: Optional[List[str]] = None):
+        """
+        :param pause_duration: Duration of the short break at the end of each work/break cycle, in minutes.
+        :param work_duration: Duration of the work part of each cycle, in minutes. By default the cycles last for an
+                              hour, with the break at the end of each hour.
+        :param long_break_duration: Duration of the long break replacing every long_break_every-th short break.
+        :param watcher_backend: Backend chosen by the user, if any. Otherwise multiple working directories are polled,
+                                and a single one is watched with the native notifications.
+        :param working_directories: All the loaded working directories, the first one by default.
+        """
         self.working_directory = working_directory
+        self.working_directories = working_directories or [working_directory]
         self.pause_text = pause_text
         self.pause_duration = pause_duration
         self.borderless = borderless
+        self.reload_delay = reload_delay
+        self.clock_mode = clock_mode
+        self.check = check
+        self.profile_startup = profile_startup
+        self.rotation_anchor = rotation_anchor
+        self.watcher_backend = watcher_backend
+        self.poll_interval = poll_interval
+        self.stats = stats
+        self.stats_output = stats_output
+        self.work_duration = work_duration if work_duration is not None else 60 - pause_duration
+        self.long_break_duration = long_break_duration
+        self.long_break_every = long_break_every
+        self.headless = headless
+        self.socket_path = socket_path
 
     @staticmethod
     def _get_default_working_dir():
@@ -25,18 +65,73 @@ class Config:
     @staticmethod
     def from_args() -> 'Config':
         parser = argparse.ArgumentParser(description='Pomodoro Day Planner (podap)')
-        parser.add_argument('--working-directory', '-wd', type=str, required=False,
-                            default=Config._get_default_working_dir(),
+        parser.add_argument('--working-directory', '-wd', type=str, required=False, action='append',
+                            dest='working_directories',
                             help='Working directory, containing a list of text files, '
                                  'each containing the day '
-                                 'schedule (e.g: 0_mo.txt)')
+                                 'schedule (e.g: 0_mo.txt). Can be given multiple times, to show multiple schedules at '
+                                 'once, each in its own window (e.g: one per project)')
         parser.add_argument('--pause-duration', '-pd', type=int, required=False, default=15,
-                            help='Pause duration, in minutes. The app is currently supports only the hourly regime!')
+                            help='Duration of the short break, in minutes. Cycles of work and breaks start at '
+                                 'midnight, and last for an hour unless the work duration is set')
+        parser.add_argument('--work-duration', '-wo', type=int, required=False, default=None,
+                            help='Duration of the work part of each cycle, in minutes (e.g: 25 for the classic '
+                                 'pomodoro cycles). Defaults to the rest of the hour after the short break')
+        parser.add_argument('--long-break-duration', '-lbd', type=int, required=False, default=0,
+                            help='Duration of the long break, in minutes')
+        parser.add_argument('--long-break-every', '-lbe', type=int, required=False, default=0,
+                            help='Take the long break instead of the short one at the end of every n-th cycle (e.g: 4)')
         parser.add_argument('--pause-text', '-pt', type=str, required=False, default='PAUSE',
                             help='Text for "pause" entries')
         parser.add_argument('--borderless', '-b', action='store_true', required=False, default=False,
                             help='Use a borderless window')
+        parser.add_argument('--reload-delay', '-rd', type=int, required=False, default=300,
+                            help='Quiet window, in milliseconds, used to fold bursts of file system events '
+                                 '(e.g: from saving a file in an editor) into a single reload')
+        parser.add_argument('--clock', '-c', type=str, required=False, default=Config.CLOCK_INLINE,
+                            choices=Config.CLOCK_MODES, dest='clock_mode',
+                            help='How to display the current time: inline with the next task, in a separate '
+                                 'fixed-size element, or not at all. Without a clock the app only wakes up when '
+                                 'the displayed task changes')
+        parser.add_argument('--check', action='store_true', required=False, default=False,
+                            help='Validate the schedule in the working directory and exit, without starting the GUI')
+        parser.add_argument('--headless', action='store_true', required=False, default=False,
+                            help='Run without the GUI, printing the current and the next task as a JSON line on '
+                                 'stdout whenever they change (e.g: for status bars)')
+        parser.add_argument('--socket', type=str, required=False, default=None, dest='socket_path',
+                            help='Answer the schedule queries of local clients (e.g: scripts or editor plugins) on '
+                                 'a Unix domain socket at the given path')
+        parser.add_argument('--profile-startup', action='store_true', required=False, default=False,
+                            help='Report the time spent in imports, creating the model, constructing the main window, '
+                                 'and until both the schedules are loaded (in the background) and the first paint')
+        parser.add_argument('--rotation-anchor', '-ra', type=date.fromisoformat, required=False, default=None,
+                            help='Any date (YYYY-MM-DD) in the first week of the week rotation (e.g: w0-0_mo.txt)')
+        parser.add_argument('--watcher', '-w', type=str, required=False, default=None,
+                            choices=Config.WATCHER_BACKENDS, dest='watcher_backend',
+                            help='How to detect schedule changes: with the native file system notifications, or by '
+                                 'polling the working directory (e.g: for network file systems, which usually '
+                                 'don\'t support notifications). By default a single working directory is watched '
+                                 'natively, while multiple working directories are polled by a single thread')
+        parser.add_argument('--poll-interval', '-pi', type=int, required=False, default=2000,
+                            help='Interval between two polls of the working directory, in milliseconds')
+        parser.add_argument('--stats', action='store_true', required=False, default=False,
+                            help='Collect timings and counters of the hot paths, show them in the info panel and '
+                                 'dump them as JSON on exit (same as setting the PODAP_STATS environment variable)')
+        parser.add_argument('--stats-output', type=str, required=False, default=None,
+                            help='File to dump the stats to, instead of stderr')
 
         args = parser.parse_args()
-        return Config(working_directory=args.working_directory, pause_duration=args.pause_duration,
-                      pause_text=args.pause_text, borderless=args.borderless)
+
+        # The same directory is only loaded once
+        working_directories = list(dict.fromkeys(os.path.abspath(x) for x in args.working_directories or []))
+        if not working_directories:
+            working_directories = [Config._get_default_working_dir()]
+
+        return Config(working_directory=working_directories[0], pause_duration=args.pause_duration,
+                      pause_text=args.pause_text, borderless=args.borderless, reload_delay=args.reload_delay,
+                      clock_mode=args.clock_mode, check=args.check, profile_startup=args.profile_startup,
+                      rotation_anchor=args.rotation_anchor, watcher_backend=args.watcher_backend,
+                      poll_interval=args.poll_interval, stats=args.stats, stats_output=args.stats_output,
+                      work_duration=args.work_duration, long_break_duration=args.long_break_duration,
+                      long_break_every=args.long_break_every, headless=args.headless,
+                      socket_path=args.socket_path, working_directories=working_directories)
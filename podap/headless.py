@@ -0,0 +1,145 @@
+import json
+import os
+import queue
+import sys
+
+from contextlib import ExitStack
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional, TextIO, Tuple
+
+from podap.config import Config
+from podap.model import Model, ModelChange
+from podap.stats import Stats
+
+
+class HeadlessApp:
+    """
+    Streams the state of the schedule as JSON lines, without any GUI (see --headless), e.g.:
+    {"time": "2024-06-03T09:45:00", "current": "PAUSE", "next": "Work", "pause": true, "remaining": 900}
+
+    The main thread sleeps until either the next transition of the schedule or a model notification, which is handed
+    over from the reloading thread through a queue. A line is printed whenever the state changes.
+    """
+
+    # Wake up at least this often, so that we recover from system clock changes and sleep/resume in a timely manner
+    MAX_INTERVAL_S = 15 * 60
+
+    # Wake up slightly after the transition, so that the new state is guaranteed to be seen
+    SLACK_S = 0.02
+
+    def __init__(self, model: Model, notifications: 'queue.Queue[Callable[[], None]]', output: TextIO = sys.stdout,
+                 label: Optional[str] = None):
+        """
+        :param notifications: Model notifications, should be used as the model's dispatcher.
+        :param label: Added to each line as "directory", to tell apart the schedules of multiple working directories.
+        """
+        self.model = model
+        self.notifications = notifications
+        self.output = output
+        self.label = label
+
+        # Current, next, pause state and the end of the state, as of the last printed line
+        self.last_state = None  # type: Optional[Tuple]
+
+        self.model.subscribe_to_changes(self.on_model_change)
+        self.model.subscribe_to_errors(self.on_model_error)
+
+    def on_model_change(self, _, __: ModelChange):
+        self.update()
+
+    def on_model_error(self, _, message: str):
+        self.last_state = None
+        self._print({'time': datetime.now().isoformat(timespec='seconds'), 'error': message})
+
+    def _print(self, line: dict):
+        if self.label is not None:
+            line['directory'] = self.label
+
+        Stats.INSTANCE.count('headless.lines')
+        print(json.dumps(line), file=self.output, flush=True)
+
+    def update(self, now: Optional[datetime] = None):
+        """ Print the current state, unless it is the same as the last printed one """
+        if not self.model.loaded:
+            return
+
+        now = now or datetime.now()
+        time = now.isoformat(timespec='seconds')
+        try:
+            # Use a single snapshot, so that all the fields are consistent with each other
+            schedule = self.model.schedule
+            state = (schedule.get_current_task(now).title, schedule.get_pending_task(now).title,
+                     schedule.is_on_break(now), schedule.get_next_transition(now))
+        except ValueError as e:
+            state = (str(e),)
+            if state != self.last_state:
+                self.last_state = state
+                self._print({'time': time, 'error': str(e)})
+            return
+
+        if state == self.last_state:
+            return
+
+        self.last_state = state
+        current, pending, pause, until = state
+        self._print({'time': time, 'current': current, 'next': pending, 'pause': pause,
+                     'remaining': max(round((until - now).total_seconds()), 0)})
+
+    def _get_timeout(self, now: datetime) -> float:
+        if not self.model.loaded:
+            return self.MAX_INTERVAL_S
+
+        timeout = (self.model.get_next_transition(now) - now) / timedelta(seconds=1) + self.SLACK_S
+        return min(max(timeout, 0.0), self.MAX_INTERVAL_S)
+
+    @staticmethod
+    def loop(apps: List['HeadlessApp']):
+        """ Process the notifications and the transitions, until interrupted. All the apps share the notifications """
+        notifications = apps[0].notifications
+        while True:
+            now = datetime.now()
+            for app in apps:
+                app.update(now)
+
+            try:
+                notification = notifications.get(timeout=min(x._get_timeout(now) for x in apps))
+            except queue.Empty:
+                Stats.INSTANCE.count('headless.wakeups')
+                continue
+
+            notification()
+
+    @staticmethod
+    def run() -> int:
+        # Imported here, because the watcher pulls in watchdog, and the server asyncio
+        from podap.model import Watcher
+        from podap.server import QueryServer
+
+        # Model notifications are delivered on the main thread, no matter which thread reloaded the model
+        notifications = queue.Queue()  # type: queue.Queue[Callable[[], None]]
+        directories = Config.INSTANCE.working_directories
+        apps = []  # type: List[HeadlessApp]
+        for directory in directories:
+            model = Model(dispatcher=notifications.put, load=False, working_directory=directory)
+            apps.append(HeadlessApp(model, notifications, label=directory if len(directories) > 1 else None))
+            model.request_reload()
+
+        with ExitStack() as stack:
+            for app in apps:
+                stack.enter_context(Watcher(model=app.model))
+            try:
+                stack.enter_context(QueryServer.from_config(apps[0].model))
+            except OSError as e:
+                # E.g.: another instance is already serving the socket
+                print(f'Error serving queries on {Config.INSTANCE.socket_path}: {e}', file=sys.stderr)
+                return 1
+
+            try:
+                HeadlessApp.loop(apps)
+            except KeyboardInterrupt:
+                pass
+            except BrokenPipeError:
+                # The reader is gone (e.g.: `podap --headless | head -n 1`), don't complain about it on exit
+                os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+
+        return 0
@@ -1,5 +1,19 @@
 from podap.model.hour_entry import HourEntry
+from podap.model.timeline import DayTimeline
 from podap.model.day_entry import DayEntry
 from podap.model.day_entry import DayOfWeek
+from podap.model.calendar import Calendar, DatedDay
+from podap.model.model_change import ModelChange, DayChange
+from podap.model.schedule import Schedule
+from podap.model.reload_worker import ReloadWorker
+from podap.model.parse_cache import ParseCache, CachedFile
 from podap.model.model import Model
-from podap.model.watcher import Watcher
+
+
+def __getattr__(name: str):
+    # The watcher pulls in watchdog, which is not needed to parse or query the schedule, so only import it on demand
+    if name == 'Watcher':
+        from podap.model.watcher import Watcher
+        return Watcher
+
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -0,0 +1,113 @@
+import heapq
+
+from bisect import bisect_right
+from datetime import date
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Optional, Tuple
+
+from podap.model import DayEntry, DayOfWeek
+
+
+class DatedDay(NamedTuple):
+    """ Day schedule applied to every date in the [first, last] range (e.g.: a holiday or an on-call week) """
+    first: date
+    last: date
+    day: DayEntry
+
+
+class Calendar:
+    """
+    Date-dependent part of the schedule, taking precedence over the weekly days:
+    - dated days, overriding the schedule for a range of dates;
+    - week rotations, replacing a day of week in every n-th week, counted from the anchor date.
+
+    Dated days are compiled into a sorted list of non-overlapping date intervals, so that each lookup is a single
+    bisection. If dated days overlap, the one with the narrower range wins, then the one starting later.
+    """
+
+    # Monday of the first week of the rotation, unless configured otherwise
+    DEFAULT_ANCHOR = date(2024, 1, 1)
+
+    __slots__ = ('starts', 'ends', 'days', 'rotation', 'period', 'anchor', 'signature')
+
+    def __init__(self, dated: Iterable[DatedDay] = (),
+                 rotation: Optional[Mapping[Tuple[int, DayOfWeek], DayEntry]] = None, anchor: Optional[date] = None):
+        """
+        :param dated: Dated days, in any order.
+        :param rotation: Days of the rotated weeks, keyed by the week number (starting at 0) and the day of week. The
+                         rotation period is the number of the last week plus one.
+        :param anchor: Any date in the week number 0 of the rotation.
+        """
+        rotation = rotation or {}
+        anchor = anchor or Calendar.DEFAULT_ANCHOR
+
+        # Ordinals of the first and of the one past the last date of each interval, and the interval's day
+        self.starts = []  # type: List[int]
+        self.ends = []  # type: List[int]
+        self.days = []  # type: List[DayEntry]
+        for start, end, day in Calendar._compile(dated):
+            self.starts.append(start)
+            self.ends.append(end)
+            self.days.append(day)
+
+        self.period = max((week for week, _ in rotation), default=-1) + 1
+        self.anchor = anchor.toordinal() - anchor.weekday()
+
+        # Keyed by the week and the day number
+        self.rotation = {}  # type: Dict[Tuple[int, int], DayEntry]
+        for (week, day_of_week), day in rotation.items():
+            self.rotation[(week, day_of_week.value[0])] = day
+
+        # Compared across reloads to find out whether anything date-dependent has changed
+        self.signature = (tuple((s, e, d.content_hash) for s, e, d in zip(self.starts, self.ends, self.days)),
+                          tuple(sorted((k, d.content_hash) for k, d in self.rotation.items())),
+                          self.anchor)
+
+    @staticmethod
+    def _compile(dated: Iterable[DatedDay]) -> List[Tuple[int, int, DayEntry]]:
+        """ Sweep over the interval boundaries, keeping the candidates for the current interval in a heap """
+        ranges = sorted((x.first.toordinal(), x.last.toordinal() + 1, i, x.day) for i, x in enumerate(dated))
+        boundaries = sorted({x[0] for x in ranges} | {x[1] for x in ranges})
+
+        result = []  # type: List[Tuple[int, int, DayEntry]]
+        candidates = []  # type: List[Tuple[int, int, int, int, DayEntry]]
+        next_range = 0
+        for boundary, following in zip(boundaries, boundaries[1:]):
+            while next_range < len(ranges) and ranges[next_range][0] == boundary:
+                start, end, i, day = ranges[next_range]
+                heapq.heappush(candidates, (end - start, -start, i, end, day))
+                next_range += 1
+
+            # Lazily drop the ranges that are already over
+            while candidates and candidates[0][3] <= boundary:
+                heapq.heappop(candidates)
+
+            if not candidates:
+                continue
+
+            day = candidates[0][4]
+            if result and result[-1][1] == boundary and result[-1][2] is day:
+                result[-1] = (result[-1][0], following, day)
+            else:
+                result.append((boundary, following, day))
+
+        return result
+
+    def is_empty(self) -> bool:
+        return len(self.starts) == 0 and len(self.rotation) == 0
+
+    def week_number(self, day: date) -> int:
+        """ Number of the rotation week the date belongs to """
+        return (day.toordinal() - self.anchor) // 7 % self.period
+
+    def get_day(self, day: date) -> Optional[DayEntry]:
+        """ Get the day overriding the weekly schedule at the given date, if any """
+        ordinal = day.toordinal()
+        if self.starts:
+            i = bisect_right(self.starts, ordinal) - 1
+            if i >= 0 and ordinal < self.ends[i]:
+                return self.days[i]
+
+        if self.period != 0:
+            return self.rotation.get((self.week_number(day), day.weekday()))
+
+        return None
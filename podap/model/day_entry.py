@@ -1,10 +1,14 @@
+import hashlib
+
 from enum import Enum
-from typing import List
+from itertools import repeat
+from typing import Iterable, Optional
 from io import StringIO
 
 from datetime import datetime
 
-from podap.model import HourEntry
+from podap.model import HourEntry, DayTimeline
+from podap.model.tokenizer import tokenize_columns
 
 
 class DayOfWeek(Enum):
@@ -24,9 +28,8 @@ class DayOfWeek(Enum):
 
     @staticmethod
     def from_number(number: int):
-        for kv in DayOfWeek:
-            if kv.value[0] == number:
-                return kv
+        if 0 <= number < len(_DAYS_BY_NUMBER):
+            return _DAYS_BY_NUMBER[number]
 
         raise ValueError(f'unexpected day of week number: {number}')
 
@@ -36,28 +39,54 @@ class DayOfWeek(Enum):
 
     @staticmethod
     def from_date_time(date: datetime):
-        return DayOfWeek.from_number(date.weekday())
+        return _DAYS_BY_NUMBER[date.weekday()]
+
+
+# Days of week, indexed by their numbers
+_DAYS_BY_NUMBER = tuple(sorted(DayOfWeek, key=lambda x: x.value[0]))
 
 
 class DayEntry:
     ENTRY_SEPARATOR = '\n\n'
 
-    def __init__(self, day_of_week: DayOfWeek, entries: List[HourEntry], path: str):
+    __slots__ = ('day_of_week', 'entries', 'path', '_content_hash', '_timeline')
+
+    def __init__(self, day_of_week: DayOfWeek, entries: Iterable[HourEntry], path: Optional[str] = None):
         self.day_of_week = day_of_week
-        self.entries = entries
+        self.entries = tuple(entries)
         self.path = path
+        self._content_hash = None  # type: Optional[str]
+        self._timeline = None  # type: Optional[DayTimeline]
+
+    @property
+    def content_hash(self) -> str:
+        """ Hash of the entries, stable across runs (unlike hash()), and independent of the file formatting """
+        if self._content_hash is None:
+            h = hashlib.blake2b(digest_size=16)
+            for x in self.entries:
+                h.update(f'{x.start_hour}:{x.start_minute}+{x.duration_minutes}\x1f{x.title}\x1e'.encode())
+            self._content_hash = h.hexdigest()
+        return self._content_hash
+
+    @property
+    def timeline(self) -> DayTimeline:
+        """ Entries compiled into non-overlapping segments (the model compiles its days before publishing them) """
+        if self._timeline is None:
+            self.compile()
+        return self._timeline
+
+    def compile(self):
+        """ Build the timeline, unless it is already built. Days should be compiled before sharing them with threads """
+        if self._timeline is None:
+            self._timeline = DayTimeline(self.entries)
 
     @staticmethod
-    def parse(day_of_week: DayOfWeek, text: str, path: str):
-        text_entries = text.split(DayEntry.ENTRY_SEPARATOR)
-
-        hour_entries = []
-        for entry in text_entries:
-            try:
-                hour_entries.append(HourEntry.parse(entry))
-            except ValueError as ex:
-                raise ValueError(f'bad DayEntry for {day_of_week.name}: {ex}') from ex
-
+    def parse(day_of_week: DayOfWeek, text: str, path: Optional[str] = None):
+        location = path if path is not None else day_of_week.name
+        columns = tokenize_columns(text, location)
+        # Built straight from the columns, skipping the keyword argument handling of the named tuple constructor
+        fields = zip(columns.hours, columns.titles, columns.durations, columns.minutes)
+        hour_entries = list(map(tuple.__new__, repeat(HourEntry), fields))
         return DayEntry(day_of_week=day_of_week, entries=hour_entries, path=path)
 
     def __str__(self):
@@ -1,38 +1,44 @@
-class HourEntry:
+from typing import NamedTuple
 
-    def __init__(self, start_hour: int, title: str, duration: int = 1):
-        # TODO: Use datetime.time for starting time and datetime.timedelta for duration
-        self.start_hour = start_hour
-        self.duration = duration
-        self.end_hour = self.start_hour + self.duration
-        self.title = title
+from podap.model.tokenizer import tokenize, ScheduleSyntaxError, DEFAULT_DURATION
 
-    @staticmethod
-    def parse(text: str):
-        error_msg = f'bad HourEntry: "{text}"'
 
-        parts = text.split('\n')
-        if len(parts) != 2:
-            raise ValueError(error_msg)
+class HourEntry(NamedTuple):
+    """ A single immutable schedule entry, lasting for duration_minutes (an hour by default) """
+
+    # Note: times are kept as plain minutes since midnight, which is all the timeline needs to compile the days
+    start_hour: int
+    title: str
+    duration_minutes: int = DEFAULT_DURATION
+    start_minute: int = 0
 
-        text = parts[0]
-        time = parts[1].split(':')
+    @property
+    def start(self) -> int:
+        """ Start, in minutes since midnight """
+        return self.start_hour * 60 + self.start_minute
 
-        if len(time) != 2:
-            raise ValueError(error_msg)
+    @property
+    def end(self) -> int:
+        """ End (exclusive), in minutes since midnight, may be past the end of the day """
+        return self.start_hour * 60 + self.start_minute + self.duration_minutes
 
-        try:
-            time = int(time[0])
-        except ValueError:
-            raise ValueError(error_msg)
+    @staticmethod
+    def parse(text: str, location: str = '<text>'):
+        entries = [HourEntry(x.hour, x.title, x.duration, x.minute) for x in tokenize(text, location)]
+        if len(entries) != 1:
+            raise ScheduleSyntaxError(f'expected exactly one entry, got {len(entries)}', location, 1, 1)
 
-        return HourEntry(start_hour=time, title=text)
+        return entries[0]
 
-    def is_active(self, hour: int) -> bool:
-        return self.start_hour <= hour < self.end_hour
+    def is_active(self, hour: int, minute: int = 0) -> bool:
+        return self.start <= hour * 60 + minute < self.end
 
     def __str__(self):
-        return f'{self.title}\n{self.start_hour:02}:00'
+        if self.duration_minutes == DEFAULT_DURATION:
+            return f'{self.title}\n{self.start_hour:02}:{self.start_minute:02}'
+
+        end_hour, end_minute = divmod(self.end, 60)
+        return f'{self.title}\n{self.start_hour:02}:{self.start_minute:02}-{end_hour:02}:{end_minute:02}'
 
     def __repr__(self):
-        return f'<HourEntry(start_hour={self.start_hour!r},title={self.title!r})>'
+        return f'<HourEntry(start_hour={self.start_hour!r},start_minute={self.start_minute!r},title={self.title!r})>'
@@ -1,52 +1,158 @@
-import glob
+import fnmatch
+import hashlib
 import os
+import sys
+import threading
 
-from typing import Dict, Callable, List
-from datetime import datetime, timedelta
+from itertools import chain
+from typing import Dict, Callable, List, Mapping, Optional, Tuple
+from datetime import date, datetime, timedelta
 
-from podap.model import DayEntry, DayOfWeek, HourEntry
+from podap.model import DayEntry, DayOfWeek, DayTimeline, HourEntry, Calendar, DatedDay, ModelChange, Schedule, \
+    ReloadWorker, ParseCache, CachedFile
 from podap.config import Config
+from podap.stats import Stats
 
 
 class Model:
+    FILE_PATTERN = '*.txt'
 
     class File:
-        def __init__(self, absolute_path: str):
+        """ A single schedule file together with the day parsed from it """
+
+        def __init__(self, absolute_path: str, stat_signature: Tuple[int, int, int], data: Optional[bytes],
+                     content_hash: Optional[bytes] = None):
+            """
+            :param data: Contents of the file, or None if the file was restored from the parse cache, in which case
+                         the content hash has to be provided instead.
+            """
             self.absolute_path = absolute_path
             self.file_name = os.path.basename(self.absolute_path)
 
             error_message = f'bad file name {self.file_name}'
 
-            # Try to detect which day of week it is
+            # Try to detect which day it is
             name_parts = self.file_name.split('_')
             if len(name_parts) != 2:
                 raise ValueError(error_message)
 
+            self.day_number = None  # type: Optional[int]
+            self.week = None  # type: Optional[int]
+            self.dates = None  # type: Optional[Tuple[date, date]]
             try:
-                self.day_number = int(name_parts[0])
+                self._parse_key(name_parts[0])
             except ValueError:
                 raise ValueError(error_message)
 
-            # Load the file contents
-            with open(self.absolute_path, 'r') as f:
-                self.text = f.read().strip()
-
-    def __init__(self):
-        self.working_directory = Config.INSTANCE.working_directory
-        self.days = {}  # type: Dict[DayOfWeek, DayEntry]
-        self.file_search_pattern = os.path.join(self.working_directory, '*.txt')
-        self.on_change_listeners = []  # type: List[Callable[[Model], None]]
+            # (inode, size, mtime_ns) as reported by the last stat call
+            self.stat_signature = stat_signature
+            self.content_hash = content_hash if data is None else Model.File.hash(data)
+
+            # Only read on demand for the files restored from the parse cache
+            self.text = None if data is None else data.decode()  # type: Optional[str]
+
+            # Parsed lazily, once the day numbering of the whole directory is known
+            self.day = None  # type: Optional[DayEntry]
+
+        def _parse_key(self, key: str):
+            """
+            The key is one of:
+            - a day of week number: 0_mo.txt;
+            - a rotation week and a day of week number: w1-0_mo.txt;
+            - a date or an inclusive range of dates: 2024-12-24_eve.txt, 2024-12-27..2024-12-31_holidays.txt.
+            """
+            if key.startswith('w'):
+                week, day_number = key[1:].split('-')
+                self.week = int(week)
+                self.day_number = int(day_number)
+                if self.week < 0:
+                    raise ValueError(f'negative week number: {self.week}')
+            elif '-' in key:
+                dates = [date.fromisoformat(x) for x in key.split('..')]
+                if len(dates) > 2 or dates[-1] < dates[0]:
+                    raise ValueError(f'bad date range: {key}')
+                self.dates = (dates[0], dates[-1])
+            else:
+                self.day_number = int(key)
+
+        @staticmethod
+        def hash(data: bytes) -> bytes:
+            return hashlib.blake2b(data, digest_size=16).digest()
+
+        @staticmethod
+        def from_cache(absolute_path: str, cached: CachedFile) -> 'Model.File':
+            file = Model.File(absolute_path, cached.stat_signature, None, cached.content_hash)
+            file.day = cached.day
+            return file
+
+        def to_cache(self) -> CachedFile:
+            return CachedFile(self.stat_signature, self.content_hash, self.day)
+
+        def get_day(self, day_of_week: DayOfWeek) -> DayEntry:
+            if self.day is None or self.day.day_of_week != day_of_week:
+                if self.text is None:
+                    with open(self.absolute_path, 'rb') as f:
+                        data = f.read()
+                    self.content_hash = Model.File.hash(data)
+                    self.text = data.decode()
+
+                self.day = DayEntry.parse(day_of_week, self.text, self.absolute_path)
+                Stats.INSTANCE.count('model.files_parsed')
+            return self.day
+
+    def __init__(self, dispatcher: Optional[Callable[[Callable[[], None]], None]] = None, load: bool = True,
+                 cache: Optional[ParseCache] = None, working_directory: Optional[str] = None):
+        """
+        :param dispatcher: Used to deliver the change and error notifications (e.g.: on the GUI thread), by default
+                           the listeners are called directly from the reloading thread.
+        :param load: Load the working directory right away. Otherwise the model stays empty until the first reload
+                     (e.g.: requested with request_reload).
+        :param cache: Persists the parsed files between the runs. Read by the first reload, and written on every
+                      reload, unless the stat signatures of the files are unchanged, in which case the write is skipped.
+        :param working_directory: Directory to load the schedule from, the configured one by default.
+        """
+        self.working_directory = working_directory or Config.INSTANCE.working_directory
+        self.dispatcher = dispatcher if dispatcher is not None else Model._call
+
+        # The breaks are the same every day, so they are compiled once and shared by all the snapshots
+        config = Config.INSTANCE
+        self.breaks = DayTimeline.cycles(config.work_duration, config.pause_duration, config.long_break_duration,
+                                         config.long_break_every, sys.intern(config.pause_text))
+
+        # Current snapshot, only ever replaced as a whole, so it can be read from any thread without locking
+        self.schedule = Schedule({}, self.breaks)
+
+        # Only used by the reloading thread
+        self.reload_lock = threading.Lock()
+        self.files = {}  # type: Dict[str, Model.File]
+        self.cache = cache
+        self.cache_loaded = False
+        self.loaded = False
+        self.reload_worker = ReloadWorker(self.changed_from_outside)
+
+        self.on_change_listeners = []  # type: List[Callable[[Model, ModelChange], None]]
         self.on_error_listeners = []  # type: List[Callable[[Model, str], None]]
-        self.reload()
 
-    def subscribe_to_changes(self, listener: Callable[['Model'], None]):
+        if load:
+            self.reload()
+
+    @staticmethod
+    def _call(fn: Callable[[], None]):
+        fn()
+
+    @property
+    def days(self) -> Mapping[DayOfWeek, DayEntry]:
+        return self.schedule.days
+
+    def subscribe_to_changes(self, listener: Callable[['Model', ModelChange], None]):
         self.on_change_listeners.append(listener)
 
-    def unsubscribe_from_changes(self, listener: Callable[['Model'], None]):
+    def unsubscribe_from_changes(self, listener: Callable[['Model', ModelChange], None]):
         try:
             self.on_change_listeners.remove(listener)
         except ValueError as e:
-            print(f'Error unsubscribing from model changes: {e}')
+            Stats.INSTANCE.count('model.unsubscribe_errors')
+            print(f'Error unsubscribing from model changes: {e}', file=sys.stderr)
 
     def subscribe_to_errors(self, listener: Callable[['Model', str], None]):
         self.on_error_listeners.append(listener)
@@ -55,94 +161,167 @@ class Model:
         try:
             self.on_error_listeners.remove(listener)
         except ValueError as e:
-            print(f'Error unsubscribing from model errors: {e}')
+            Stats.INSTANCE.count('model.unsubscribe_errors')
+            print(f'Error unsubscribing from model errors: {e}', file=sys.stderr)
+
+    def request_reload(self):
+        """ Reload the model in the background, results are delivered as usual through the listeners """
+        self.reload_worker.request()
 
     def changed_from_outside(self):
         try:
             self.reload()
-        except ValueError as e:
-            for listener in self.on_error_listeners:
-                listener(self, str(e))
+        except (ValueError, OSError) as e:
+            message = str(e)
+            Stats.INSTANCE.count('model.reload_errors')
+            self.dispatcher(lambda: self._notify_error(message))
 
-    def reload(self):
-        files = glob.glob(self.file_search_pattern)
-        files = [Model.File(x) for x in files]
+    def _notify_error(self, message: str):
+        for listener in list(self.on_error_listeners):
+            listener(self, message)
 
-        if len(files) == 0:
-            raise ValueError(f'Could not load the working directory: {self.working_directory}')
+    def _notify_change(self, change: ModelChange):
+        for listener in list(self.on_change_listeners):
+            listener(self, change)
 
-        # Adjust the day numbers to match the internal day numbering format
-        min_day_number = None
-        for file in files:
-            if min_day_number is None or file.day_number < min_day_number:
-                min_day_number = file.day_number
-
-        if min_day_number == 1:
-            for file in files:
-                file.day_number -= 1
-        elif min_day_number != 0:
-            raise ValueError('day numbers should start with either 0 or 1')
+    def _scan(self) -> Dict[str, 'Model.File']:
+        """ Stat the working directory, only (re-)reading the files with a changed signature """
+        files = {}  # type: Dict[str, Model.File]
 
-        files.sort(key=lambda x: x.day_number)
+        try:
+            with os.scandir(self.working_directory) as it:
+                entries = [x for x in it if not x.name.startswith('.') and fnmatch.fnmatch(x.name, self.FILE_PATTERN)]
+        except OSError as e:
+            # Reported instead of treating the directory as empty, the next reload is going to try again
+            raise ValueError(f'Could not read the working directory {self.working_directory}: {e.strerror}')
 
-        new_days = [DayEntry.parse(DayOfWeek.from_number(x.day_number), x.text, x.absolute_path) for x in files]
-        new_days = {x.day_of_week: x for x in new_days}
+        for entry in entries:
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                # Removed while we were scanning
+                continue
 
-        # We start with an emtpy map of days, so we have to handle it as well
-        changed = len(self.days) == 0
-        for key in new_days:
-            if changed:
-                break
+            signature = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+            cached = self.files.get(entry.path)
+            if cached is not None and cached.stat_signature == signature:
+                files[entry.path] = cached
+                continue
 
-            new_entry = new_days[key]
-            old_entry = self.days[key]
-            if str(new_entry) != str(old_entry):
-                changed = True
+            try:
+                with open(entry.path, 'rb') as f:
+                    data = f.read()
+            except OSError:
+                # Removed since the stat call (e.g.: an editor saving by renaming), or not a regular file
+                continue
+            Stats.INSTANCE.count('model.files_read')
 
-        if not changed:
-            return
+            if cached is not None and cached.content_hash == Model.File.hash(data):
+                # Touched, but not changed: keep the parsed day
+                cached.stat_signature = signature
+                files[entry.path] = cached
+                continue
 
-        self.days = new_days
+            files[entry.path] = Model.File(entry.path, signature, data)
 
-        # Issue an event
-        for listener in self.on_change_listeners:
-            listener(self)
+        return files
 
-    @staticmethod
-    def _make_pause(hour: int):
-        return HourEntry(start_hour=hour, title=Config.INSTANCE.pause_text)
+    def reload(self):
+        with self.reload_lock, Stats.INSTANCE.timer('model.reload_ms'):
+            self._reload()
+
+    def _reload(self):
+        if self.cache is not None and not self.cache_loaded:
+            # Seed the files, so that the scan only has to reparse the ones that changed since the last run
+            self.cache_loaded = True
+            for path, cached in self.cache.load().items():
+                try:
+                    self.files[path] = Model.File.from_cache(path, cached)
+                except ValueError:
+                    # E.g.: the file name is no longer valid, so just let the scan report it
+                    pass
+
+        files = self._scan()
 
-    def get_for_day_and_time(self, day: DayOfWeek, hour: int, minute: int) -> HourEntry:
-        if minute >= (60 - Config.INSTANCE.pause_duration):
-            return Model._make_pause(hour)
+        if len(files) == 0:
+            raise ValueError(f'Could not load the working directory: {self.working_directory}')
 
-        entry_day = self.days[day]
-        task = None
-        for entry in entry_day.entries:
-            if entry.is_active(hour):
-                task = entry
-                break
+        # Adjust the day numbers to match the internal day numbering format
+        day_numbers = [x.day_number for x in files.values() if x.day_number is not None]
+        if len(day_numbers) == 0:
+            raise ValueError(f'No days of week found in the working directory: {self.working_directory}')
 
-        if task is None:
-            raise ValueError(f'No entry found for {day.name} at {hour:02}:{minute:02}')
+        min_day_number = min(day_numbers)
+        if min_day_number not in (0, 1):
+            raise ValueError('day numbers should start with either 0 or 1')
 
-        return task
+        new_days = {}  # type: Dict[DayOfWeek, DayEntry]
+        rotation = {}  # type: Dict[Tuple[int, DayOfWeek], DayEntry]
+        dated = []  # type: List[DatedDay]
+        for file in sorted(files.values(), key=lambda x: x.file_name):
+            if file.dates is not None:
+                first, last = file.dates
+                dated.append(DatedDay(first, last, file.get_day(DayOfWeek.from_date_time(first))))
+                continue
+
+            day = file.get_day(DayOfWeek.from_number(file.day_number - min_day_number))
+            if file.week is None:
+                new_days[day.day_of_week] = day
+            else:
+                rotation[(file.week, day.day_of_week)] = day
+
+        # Compile the timelines here, on the worker, so that the published schedule is never modified by its readers
+        for day in chain(new_days.values(), rotation.values(), (x.day for x in dated)):
+            day.compile()
+
+        self.files = files
+        if self.cache is not None:
+            self._save_cache()
+
+        # Unchanged files keep their parsed days, and the reparsed ones are compared by their content hashes
+        old_schedule = self.schedule
+        calendar = Calendar(dated, rotation, Config.INSTANCE.rotation_anchor)
+        change = ModelChange.compute(old_schedule.days, new_days, old_schedule.calendar, calendar)
+
+        # Note: days are replaced even without any content changes, because the files could have been renamed
+        self.schedule = Schedule(new_days, self.breaks, calendar)
+        self.loaded = True
+        if change.is_empty():
+            return
 
-    def get_current_day(self):
-        return self.days[DayOfWeek.today()]
+        # Issue an event
+        self.dispatcher(lambda: self._notify_change(change))
+
+    def _save_cache(self):
+        try:
+            self.cache.save({path: x.to_cache() for path, x in self.files.items()})
+        except OSError as e:
+            # Not fatal, the next start is just going to be slower
+            print(f'Error saving the parse cache: {e}', file=sys.stderr)
+
+    # Note: each of the following queries uses a single snapshot, use `schedule` directly to combine multiple queries
+
+    def get_for_day_and_time(self, day: DayOfWeek, hour: int, minute: int) -> HourEntry:
+        return self.schedule.get_for_day_and_time(day, hour, minute)
+
+    def get_current_day(self) -> DayEntry:
+        return self.schedule.get_current_day()
 
     def get_for_date(self, date: datetime) -> HourEntry:
-        return self.get_for_day_and_time(DayOfWeek.from_date_time(date), date.hour, date.minute)
+        return self.schedule.get_for_date(date)
 
     def get_current_task(self) -> HourEntry:
-        now = datetime.now()
-        day = DayOfWeek.today()
-        return self.get_for_day_and_time(day, now.hour, now.minute)
+        return self.schedule.get_current_task()
 
     def get_pending_task(self) -> HourEntry:
-        now = datetime.now()
-        now += timedelta(hours=1)
-        day = DayOfWeek.from_date_time(now)
+        return self.schedule.get_pending_task()
+
+    def get_time_remaining(self) -> timedelta:
+        return self.schedule.get_time_remaining()
 
-        # Use fixed minute to make sure we don't land on a pause
-        return self.get_for_day_and_time(day, now.hour, 5)
+    def get_next_transition(self, date: datetime) -> datetime:
+        """
+        Get the time of the next possible change of the current or the pending task: either the start or the end of a
+        break, or the start of the next entry of the day.
+        """
+        return self.schedule.get_next_transition(date)
@@ -0,0 +1,74 @@
+from typing import Dict, Mapping, NamedTuple, Optional, Tuple
+
+from podap.model import Calendar, DayEntry, DayOfWeek
+
+
+class DayChange(NamedTuple):
+    """ Change of a single day. Either old or new is None if the day was added or removed """
+    day_of_week: DayOfWeek
+    old: Optional[DayEntry]
+    new: Optional[DayEntry]
+
+    # Positions of the entries that differ between the old and the new day (including the added and removed ones)
+    changed_entries: Tuple[int, ...]
+
+    @staticmethod
+    def compute(day_of_week: DayOfWeek, old: Optional[DayEntry], new: Optional[DayEntry]) -> 'DayChange':
+        old_entries = () if old is None else old.entries
+        new_entries = () if new is None else new.entries
+
+        changed = tuple(i for i in range(max(len(old_entries), len(new_entries)))
+                        if i >= len(old_entries) or i >= len(new_entries) or old_entries[i] != new_entries[i])
+        return DayChange(day_of_week=day_of_week, old=old, new=new, changed_entries=changed)
+
+
+class ModelChange:
+    """ Difference between two versions of the model's days, passed along with each change notification """
+
+    def __init__(self, days: Dict[DayOfWeek, DayChange], calendar_changed: bool = False):
+        """
+        :param days: Changes of the weekly days.
+        :param calendar_changed: Whether any of the dated days or rotated weeks has changed. Those can apply to any day
+                                 of week, so such a change affects all of them.
+        """
+        self.days = days
+        self.calendar_changed = calendar_changed
+
+    @staticmethod
+    def compute(old_days: Mapping[DayOfWeek, DayEntry], new_days: Mapping[DayOfWeek, DayEntry],
+                old_calendar: Optional[Calendar] = None, new_calendar: Optional[Calendar] = None) -> 'ModelChange':
+        days = {}
+        for day_of_week in set(old_days) | set(new_days):
+            old = old_days.get(day_of_week)
+            new = new_days.get(day_of_week)
+            if old is new:
+                continue
+
+            if old is None or new is None or old.content_hash != new.content_hash:
+                days[day_of_week] = DayChange.compute(day_of_week, old, new)
+
+        old_signature = None if old_calendar is None else old_calendar.signature
+        new_signature = None if new_calendar is None else new_calendar.signature
+        return ModelChange(days, calendar_changed=old_signature != new_signature)
+
+    @property
+    def added(self) -> Tuple[DayOfWeek, ...]:
+        return tuple(x.day_of_week for x in self.days.values() if x.old is None)
+
+    @property
+    def removed(self) -> Tuple[DayOfWeek, ...]:
+        return tuple(x.day_of_week for x in self.days.values() if x.new is None)
+
+    @property
+    def modified(self) -> Tuple[DayOfWeek, ...]:
+        return tuple(x.day_of_week for x in self.days.values() if x.old is not None and x.new is not None)
+
+    def is_empty(self) -> bool:
+        return len(self.days) == 0 and not self.calendar_changed
+
+    def affects(self, day_of_week: DayOfWeek) -> bool:
+        return self.calendar_changed or day_of_week in self.days
+
+    def __repr__(self):
+        return f'<ModelChange(added={self.added!r},removed={self.removed!r},modified={self.modified!r},' \
+               f'calendar_changed={self.calendar_changed!r})>'
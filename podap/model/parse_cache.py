@@ -0,0 +1,90 @@
+import json
+import os
+import sys
+import tempfile
+
+from typing import Dict, NamedTuple, Tuple
+
+from podap.model import DayEntry, DayOfWeek, HourEntry
+
+
+class CachedFile(NamedTuple):
+    """ A schedule file as it was when the cache was written """
+    stat_signature: Tuple[int, int, int]
+    content_hash: bytes
+    day: DayEntry
+
+
+class ParseCache:
+    """
+    Parsed schedule files, persisted between the runs, so that a warm start only has to stat the working directory and
+    to reparse the files that changed in the meantime.
+
+    The cache is a single JSON document with plain lists, keyed by the absolute path of each file, so that a foreign
+    file in its place can't do more than being ignored. Entries are only trusted if both the stat signature (inode,
+    size, mtime) and the content hash still match, which is checked by the model while scanning the directory. Files
+    written by a different format version are ignored.
+    """
+
+    # 2: durations in minutes instead of hours
+    # 3: JSON instead of pickle
+    FORMAT_VERSION = 3
+
+    def __init__(self, path: str):
+        self.path = path
+
+        # Stat signatures of the last loaded or saved state, used to skip writing an unchanged cache
+        self.signatures = {}  # type: Dict[str, Tuple[int, int, int]]
+
+    def load(self) -> Dict[str, CachedFile]:
+        """ Read the whole cache at once, an outdated or corrupted cache is treated as empty """
+        try:
+            with open(self.path, 'rb') as f:
+                data = f.read()
+            version, records = json.loads(data)
+        except (OSError, ValueError, TypeError):
+            return {}
+
+        if version != self.FORMAT_VERSION:
+            return {}
+
+        files = {}  # type: Dict[str, CachedFile]
+        try:
+            for path, (signature, content_hash, day_number, entries) in records.items():
+                hour_entries = [HourEntry(start_hour, sys.intern(title), duration_minutes, start_minute)
+                                for start_hour, title, duration_minutes, start_minute in entries]
+                day = DayEntry(DayOfWeek.from_number(day_number), hour_entries, path)
+                files[path] = CachedFile(tuple(signature), bytes.fromhex(content_hash), day)
+        except Exception:
+            # Anything not matching the structure written by save
+            return {}
+
+        self.signatures = {path: x.stat_signature for path, x in files.items()}
+        return files
+
+    def save(self, files: Dict[str, CachedFile]):
+        """ Atomically replace the cache file, unless none of the files changed since the last load or save """
+        signatures = {path: x.stat_signature for path, x in files.items()}
+        if signatures == self.signatures:
+            return
+
+        records = {path: (x.stat_signature, x.content_hash.hex(), x.day.day_of_week.value[0],
+                          [tuple(e) for e in x.day.entries])
+                   for path, x in files.items()}
+        data = json.dumps((self.FORMAT_VERSION, records), separators=(',', ':')).encode()
+
+        directory = os.path.dirname(self.path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.podap-cache-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, self.path)
+        except OSError:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+
+        self.signatures = signatures
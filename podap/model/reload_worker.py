@@ -0,0 +1,60 @@
+import threading
+import traceback
+
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Callable, Optional
+
+
+class ReloadWorker:
+    """
+    Runs reloads on a thread pool: at most one reload is in flight, and all the requests arriving in the meantime are
+    collapsed into a single follow-up reload.
+    """
+
+    MAX_WORKERS = 2
+
+    _shared_executor = None  # type: Optional[Executor]
+    _shared_executor_lock = threading.Lock()
+
+    def __init__(self, reload: Callable[[], None], executor: Optional[Executor] = None):
+        self.reload = reload
+        self.executor = executor if executor is not None else ReloadWorker.shared_executor()
+        self.lock = threading.Lock()
+        self.running = False
+        self.pending = False
+
+    @staticmethod
+    def shared_executor() -> Executor:
+        """ Thread pool shared by all the workers, created on first use """
+        with ReloadWorker._shared_executor_lock:
+            if ReloadWorker._shared_executor is None:
+                ReloadWorker._shared_executor = ThreadPoolExecutor(max_workers=ReloadWorker.MAX_WORKERS,
+                                                                   thread_name_prefix='podap-reload')
+            return ReloadWorker._shared_executor
+
+    def request(self):
+        with self.lock:
+            if self.running:
+                self.pending = True
+                return
+            self.running = True
+
+        self.executor.submit(self._run)
+
+    def is_busy(self) -> bool:
+        with self.lock:
+            return self.running
+
+    def _run(self):
+        while True:
+            try:
+                self.reload()
+            except Exception:
+                # Nobody is waiting for the result, so at least make sure the error doesn't go unnoticed
+                traceback.print_exc()
+
+            with self.lock:
+                if not self.pending:
+                    self.running = False
+                    return
+                self.pending = False
@@ -0,0 +1,138 @@
+import hashlib
+
+from datetime import date, datetime, timedelta
+from types import MappingProxyType
+from typing import Mapping, Optional
+
+from podap.model import Calendar, DayEntry, DayOfWeek, DayTimeline, HourEntry
+from podap.model.tokenizer import MINUTES_PER_DAY
+
+
+class Schedule:
+    """
+    Immutable snapshot of the loaded schedule.
+
+    A new snapshot is built on every model change and swapped in with a single reference assignment, so readers don't
+    need any locking. Readers should hold on to a single snapshot for the whole of a query.
+
+    Each day is compiled into a timeline of non-overlapping segments, and the breaks of the work/break cycles into
+    another one, shared by all the days. Breaks take precedence over the scheduled tasks.
+    """
+
+    __slots__ = ('days', 'calendar', 'breaks', '_content_hash')
+
+    def __init__(self, days: Mapping[DayOfWeek, DayEntry], breaks: DayTimeline, calendar: Optional[Calendar] = None):
+        self.days = MappingProxyType(dict(days))  # type: Mapping[DayOfWeek, DayEntry]
+        self.calendar = calendar if calendar is not None else Calendar()
+        self.breaks = breaks
+        self._content_hash = None  # type: Optional[str]
+
+    @property
+    def content_hash(self) -> str:
+        """ Hash of the whole schedule, stable across runs, and independent of the file names and formatting """
+        if self._content_hash is None:
+            h = hashlib.blake2b(digest_size=16)
+            for day_of_week, day in sorted(self.days.items(), key=lambda x: x[0].value[0]):
+                h.update(f'{day_of_week.value[0]}={day.content_hash}\x1e'.encode())
+            h.update(repr(self.calendar.signature).encode())
+            h.update(repr((self.breaks.starts, self.breaks.ends)).encode())
+            self._content_hash = h.hexdigest()
+        return self._content_hash
+
+    @staticmethod
+    def _midnight(date: datetime) -> datetime:
+        return date.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    def _find_day(self, day: date) -> Optional[DayEntry]:
+        """ Get the day in effect at the given date: dated days and rotated weeks come first """
+        found = None if self.calendar.is_empty() else self.calendar.get_day(day)
+        if found is not None:
+            return found
+
+        return self.days.get(DayOfWeek.from_number(day.weekday()))
+
+    def get_for_slot(self, day_number: int, hour: int, minute: int) -> HourEntry:
+        """ Get the task of the weekly schedule, without considering the calendar """
+        time = hour * 60 + minute
+        task = self.breaks.get(time)
+        if task is not None:
+            return task
+
+        day = DayOfWeek.from_number(day_number)
+        entry = self.days.get(day)
+        task = None if entry is None else entry.timeline.get(time)
+        if task is None:
+            raise ValueError(f'No entry found for {day.name} at {hour:02}:{minute:02}')
+
+        return task
+
+    def get_for_day_and_time(self, day: DayOfWeek, hour: int, minute: int) -> HourEntry:
+        return self.get_for_slot(day.value[0], hour, minute)
+
+    def get_for_date(self, date: datetime) -> HourEntry:
+        task = self.breaks.get(date.hour * 60 + date.minute)
+        if task is not None:
+            return task
+
+        return self._get_task(date)
+
+    def is_on_break(self, now: Optional[datetime] = None) -> bool:
+        now = now or datetime.now()
+        return self.breaks.find(now.hour * 60 + now.minute) != -1
+
+    def _get_task(self, date: datetime) -> HourEntry:
+        """ Get the task at the given date, ignoring the breaks """
+        day = self._find_day(date.date())
+        task = None if day is None else day.timeline.get(date.hour * 60 + date.minute)
+        if task is None:
+            raise ValueError(f'No entry found for {date:%Y-%m-%d} at {date.hour:02}:{date.minute:02}')
+
+        return task
+
+    def get_current_day(self, now: Optional[datetime] = None) -> DayEntry:
+        now = now or datetime.now()
+        day = self._find_day(now.date())
+        if day is None:
+            raise ValueError(f'No day found for {now:%Y-%m-%d}')
+
+        return day
+
+    def get_current_task(self, now: Optional[datetime] = None) -> HourEntry:
+        return self.get_for_date(now or datetime.now())
+
+    def get_pending_task(self, now: Optional[datetime] = None) -> HourEntry:
+        """ Get the task to be done after the current or the next break (or after the current task, without breaks) """
+        now = now or datetime.now()
+        midnight = Schedule._midnight(now)
+        minute = now.hour * 60 + now.minute
+
+        end = self.breaks.next_end(minute)
+        if end is None and len(self.breaks) != 0:
+            # No more breaks today, every day has the same ones
+            return self._get_task(midnight + timedelta(days=1, minutes=self.breaks.ends[0]))
+
+        if end is None:
+            day = self._find_day(now.date())
+            end = day.timeline.next_boundary(minute) if day is not None else MINUTES_PER_DAY
+
+        return self._get_task(midnight + timedelta(minutes=end))
+
+    def get_next_transition(self, now: Optional[datetime] = None) -> datetime:
+        """
+        Get the time of the next possible change of the current or the pending task: either the start or the end of a
+        break, or a boundary between two entries of the day (which also moves the day overview to the next entry).
+        """
+        now = now or datetime.now()
+        minute = now.hour * 60 + now.minute
+
+        boundary = self.breaks.next_boundary(minute)
+        day = self._find_day(now.date())
+        if day is not None:
+            boundary = min(boundary, day.timeline.next_boundary(minute))
+
+        return Schedule._midnight(now) + timedelta(minutes=boundary)
+
+    def get_time_remaining(self, now: Optional[datetime] = None) -> timedelta:
+        """ Time left until the current task or break is over """
+        now = now or datetime.now()
+        return self.get_next_transition(now) - now
@@ -0,0 +1,112 @@
+import heapq
+
+from bisect import bisect_right
+from typing import Iterable, List, Optional, Tuple
+
+from podap.model.hour_entry import HourEntry
+from podap.model.tokenizer import MINUTES_PER_DAY
+
+
+class DayTimeline:
+    """
+    Sorted, non-overlapping segments of a single day, compiled from a list of entries. Minutes not covered by any
+    entry are left out, and where entries overlap, the first one in the list wins.
+
+    Segments are kept as parallel lists, so that all the lookups are a single bisection.
+    """
+
+    __slots__ = ('starts', 'ends', 'entries')
+
+    def __init__(self, entries: Iterable[HourEntry]):
+        # Minutes since midnight, the ends are exclusive
+        self.starts = []  # type: List[int]
+        self.ends = []  # type: List[int]
+        self.entries = []  # type: List[HourEntry]
+
+        for start, end, entry in DayTimeline._compile(entries):
+            if self.entries and self.ends[-1] == start and self.entries[-1] is entry:
+                self.ends[-1] = end
+                continue
+
+            self.starts.append(start)
+            self.ends.append(end)
+            self.entries.append(entry)
+
+    @staticmethod
+    def _compile(entries: Iterable[HourEntry]) -> Iterable[Tuple[int, int, HourEntry]]:
+        """ Sweep over the entry boundaries, keeping the candidates for the current segment in a heap """
+        ranges = sorted((max(x.start, 0), min(x.end, MINUTES_PER_DAY), i, x) for i, x in enumerate(entries))
+        ranges = [x for x in ranges if x[0] < x[1]]
+        boundaries = sorted({x[0] for x in ranges} | {x[1] for x in ranges})
+
+        candidates = []  # type: List[Tuple[int, int, HourEntry]]
+        next_range = 0
+        for boundary, following in zip(boundaries, boundaries[1:]):
+            while next_range < len(ranges) and ranges[next_range][0] == boundary:
+                _, end, i, entry = ranges[next_range]
+                heapq.heappush(candidates, (i, end, entry))
+                next_range += 1
+
+            # Lazily drop the entries that are already over
+            while candidates and candidates[0][1] <= boundary:
+                heapq.heappop(candidates)
+
+            if candidates:
+                yield boundary, following, candidates[0][2]
+
+    @staticmethod
+    def cycles(work: int, short_break: int, long_break: int = 0, long_break_every: int = 0,
+               title: str = 'PAUSE') -> 'DayTimeline':
+        """
+        Timeline of the breaks of work/break cycles, starting at midnight: each cycle consists of work minutes followed
+        by a short break, and every long_break_every-th cycle ends with a long break instead (if enabled).
+        """
+        if work < 0 or short_break < 0 or long_break < 0 or long_break_every < 0:
+            raise ValueError('work and break durations should not be negative')
+        if work + short_break == 0 and (long_break == 0 or long_break_every != 1):
+            raise ValueError('work/break cycle should not be empty')
+
+        breaks = []  # type: List[HourEntry]
+        if short_break > 0 or (long_break > 0 and long_break_every > 0):
+            start = 0
+            cycle = 1
+            while start < MINUTES_PER_DAY:
+                is_long = long_break_every > 0 and cycle % long_break_every == 0
+                duration = long_break if is_long else short_break
+                break_start = start + work
+                if duration > 0 and break_start < MINUTES_PER_DAY:
+                    hour, minute = divmod(break_start, 60)
+                    breaks.append(HourEntry(hour, title, min(duration, MINUTES_PER_DAY - break_start), minute))
+
+                start = break_start + duration
+                cycle += 1
+
+        return DayTimeline(breaks)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def find(self, minute: int) -> int:
+        """ Position of the segment covering the given minute, or -1 """
+        i = bisect_right(self.starts, minute) - 1
+        if i >= 0 and minute < self.ends[i]:
+            return i
+        return -1
+
+    def get(self, minute: int) -> Optional[HourEntry]:
+        i = self.find(minute)
+        return None if i == -1 else self.entries[i]
+
+    def next_boundary(self, minute: int) -> int:
+        """ The first start or end of a segment after the given minute, or the end of the day """
+        i = bisect_right(self.starts, minute)
+        if i > 0 and self.ends[i - 1] > minute:
+            return self.ends[i - 1]
+        if i < len(self.starts):
+            return self.starts[i]
+        return MINUTES_PER_DAY
+
+    def next_end(self, minute: int) -> Optional[int]:
+        """ End of the segment covering the given minute, or of the first one after it, if any """
+        i = bisect_right(self.ends, minute)
+        return self.ends[i] if i < len(self.ends) else None
@@ -0,0 +1,244 @@
+import sys
+
+from itertools import compress, repeat
+from operator import sub
+
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+
+class ScheduleSyntaxError(ValueError):
+    """ Schedule parsing error, pointing to the offending location as location:line:column """
+
+    def __init__(self, message: str, location: str, line: int, column: int):
+        super().__init__(f'{location}:{line}:{column}: {message}')
+        self.location = location
+        self.line = line
+        self.column = column
+
+
+class Token(NamedTuple):
+    """
+    A single schedule entry: a title line, directly followed by a H:MM (or HH:MM) time line. The time line may also
+    specify the end of the entry (e.g.: 9:00-9:25), otherwise the entry lasts for an hour.
+    """
+    # Interned, since titles tend to repeat a lot (e.g.: "Work" or "Sleep")
+    title: str
+    hour: int
+    minute: int
+    line: int
+
+    # In minutes
+    duration: int = 60
+
+
+class TokenColumns(NamedTuple):
+    """ Tokens split into columns: the n-th token is made of the n-th element of each column """
+    titles: List[str]
+    hours: List[int]
+    minutes: List[int]
+    lines: List[int]
+    durations: List[int]
+
+
+MINUTES_PER_DAY = 24 * 60
+DEFAULT_DURATION = 60
+
+
+WHITESPACE = ' \t\r'
+
+
+def _parse_number(text: str, start: int, stop: int, max_value: int, name: str, location: str, line: int,
+                  line_start: int) -> int:
+    if not (0 < stop - start <= 2) or not text[start:stop].isdecimal():
+        raise ScheduleSyntaxError(f'bad {name}: "{text[start:stop]}"', location, line, start - line_start + 1)
+
+    value = int(text[start:stop])
+    if value > max_value:
+        raise ScheduleSyntaxError(f'{name} out of range: {value}', location, line, start - line_start + 1)
+
+    return value
+
+
+def _parse_time(text: str, start: int, stop: int, location: str, line: int, line_start: int,
+                max_hour: int = 23) -> Tuple[int, int]:
+    separator = text.find(':', start, stop)
+    if separator == -1:
+        raise ScheduleSyntaxError(f'expected a time in the HH:MM format, got "{text[start:stop]}"', location, line,
+                                  start - line_start + 1)
+
+    hour = _parse_number(text, start, separator, max_hour, 'hour', location, line, line_start)
+    minute = _parse_number(text, separator + 1, stop, 59, 'minute', location, line, line_start)
+    return hour, minute
+
+
+def _parse_time_range(text: str, start: int, stop: int, location: str, line: int,
+                      line_start: int) -> Tuple[int, int, int]:
+    """ Parse either a start time (H:MM) or a start and an end time (H:MM-H:MM), returning the duration in minutes """
+    dash = text.find('-', start, stop)
+    if dash == -1:
+        hour, minute = _parse_time(text, start, stop, location, line, line_start)
+        return hour, minute, DEFAULT_DURATION
+
+    start_stop = dash
+    while start_stop > start and text[start_stop - 1] in WHITESPACE:
+        start_stop -= 1
+    end_start = dash + 1
+    while end_start < stop and text[end_start] in WHITESPACE:
+        end_start += 1
+
+    hour, minute = _parse_time(text, start, start_stop, location, line, line_start)
+    end_hour, end_minute = _parse_time(text, end_start, stop, location, line, line_start, max_hour=24)
+    start_minutes = hour * 60 + minute
+    end_minutes = end_hour * 60 + end_minute
+    if end_minutes > MINUTES_PER_DAY:
+        raise ScheduleSyntaxError(f'end time {end_hour:02}:{end_minute:02} is past the end of the day', location, line,
+                                  end_start - line_start + 1)
+    if end_minutes <= start_minutes:
+        raise ScheduleSyntaxError(f'end time {end_hour:02}:{end_minute:02} is not after the start time '
+                                  f'{hour:02}:{minute:02}', location, line, end_start - line_start + 1)
+    return hour, minute, end_minutes - start_minutes
+
+
+def _tokenize_lines(text: str, location: str, pos: int, line: int) -> Iterator[Token]:
+    """ Line by line tokenizer, used to precisely locate errors (and to parse anything the fast path rejects) """
+    end = len(text)
+
+    title = None
+    title_line = 0
+    title_end_column = 0
+
+    while pos <= end:
+        newline = text.find('\n', pos)
+        if newline == -1:
+            newline = end
+
+        line_start = pos
+        start = pos
+        stop = newline
+        pos = newline + 1
+
+        line += 1
+        while start < stop and text[start] in WHITESPACE:
+            start += 1
+        while stop > start and text[stop - 1] in WHITESPACE:
+            stop -= 1
+
+        if start == stop:
+            if title is not None:
+                raise ScheduleSyntaxError(f'expected a time after "{title}"', location, title_line, title_end_column)
+            continue
+
+        if title is None:
+            title = sys.intern(text[start:stop])
+            title_line = line
+            title_end_column = stop - line_start + 1
+            continue
+
+        hour, minute, duration = _parse_time_range(text, start, stop, location, line, line_start)
+        yield Token(title=title, hour=hour, minute=minute, line=title_line, duration=duration)
+        title = None
+
+    if title is not None:
+        raise ScheduleSyntaxError(f'expected a time after "{title}"', location, title_line, title_end_column)
+
+
+def _tokenize_fast(text: str) -> Optional[TokenColumns]:
+    """
+    Tokenize a schedule with bulk string and list operations, or give up (returning None) on anything unusual,
+    including all the errors.
+    """
+    # Skips the blank lines, keeping the (1-based) numbers of the remaining ones
+    lines = list(map(str.strip, text.split('\n'), repeat(WHITESPACE)))
+    numbers = list(compress(range(1, len(lines) + 1), lines))
+    lines = list(compress(lines, lines))
+
+    count = len(lines) // 2
+    if count == 0 or len(lines) != count * 2:
+        return None
+
+    # Each title has to be directly followed by its time
+    titles = lines[0::2]
+    times = lines[1::2]
+    title_lines = numbers[0::2]
+    if list(map(sub, numbers[1::2], title_lines)) != [1] * count:
+        return None
+
+    joined = ':'.join(times)
+    if '-' in joined:
+        time_ranges = list(map(_fast_time_range, times))
+        if None in time_ranges:
+            return None
+        hours, minutes, durations = map(list, zip(*time_ranges))
+    else:
+        # Exactly one colon per time, with up to two digits on each side of it
+        parts = joined.split(':')
+        if len(parts) != count * 2 or not all(map(str.__contains__, times, repeat(':'))):
+            return None
+        if not all(parts) or max(map(len, parts)) > 2 or not ''.join(parts).isdecimal():
+            return None
+
+        hours = list(map(int, parts[0::2]))
+        minutes = list(map(int, parts[1::2]))
+        if max(hours) > 23 or max(minutes) > 59:
+            return None
+        durations = [DEFAULT_DURATION] * count
+
+    # Titles tend to repeat a lot (e.g.: "Work" or "Sleep"), so only keep a single copy of each one
+    return TokenColumns(list(map(sys.intern, titles)), hours, minutes, title_lines, durations)
+
+
+def _fast_time(text: str, max_hour: int) -> Optional[int]:
+    hour_text, _, minute_text = text.strip(WHITESPACE).partition(':')
+    if len(hour_text) > 2 or len(minute_text) > 2 or not hour_text.isdecimal() or not minute_text.isdecimal():
+        return None
+
+    hour = int(hour_text)
+    minute = int(minute_text)
+    if hour > max_hour or minute > 59:
+        return None
+    return hour * 60 + minute
+
+
+def _fast_time_range(line: str) -> Optional[Tuple[int, int, int]]:
+    start_text, dash, end_text = line.partition('-')
+    start = _fast_time(start_text, 23)
+    if start is None:
+        return None
+
+    duration = DEFAULT_DURATION
+    if dash:
+        end = _fast_time(end_text, 24)
+        if end is None or not start < end <= MINUTES_PER_DAY:
+            return None
+        duration = end - start
+
+    hour, minute = divmod(start, 60)
+    return hour, minute, duration
+
+
+def tokenize(text: str, location: str = '<text>') -> List[Token]:
+    """
+    Split a schedule into entries.
+
+    Entries are separated by any number of blank lines, both LF and CRLF line endings are accepted and leading or
+    trailing whitespace is ignored.
+    """
+    columns = _tokenize_fast(text)
+    if columns is None:
+        # Go over the text once more, precisely locating the error (or parsing anything the fast path rejects)
+        return list(_tokenize_lines(text, location, 0, 0))
+
+    # Skips the keyword argument handling of the named tuple constructor, which is a large part of the cost
+    return list(map(tuple.__new__, repeat(Token), zip(*columns)))
+
+
+def tokenize_columns(text: str, location: str = '<text>') -> TokenColumns:
+    """
+    Same as tokenize(), but with the tokens split into columns. Meant for the bulk consumers, which can build their
+    own entries out of the columns directly, without going through the tokens first.
+    """
+    columns = _tokenize_fast(text)
+    if columns is None:
+        tokens = list(_tokenize_lines(text, location, 0, 0))
+        columns = TokenColumns(*map(list, zip(*tokens))) if tokens else TokenColumns([], [], [], [], [])
+    return columns
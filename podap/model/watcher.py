@@ -1,42 +1,303 @@
+import fnmatch
+import os
+import threading
+import time
+
+from typing import Callable, Dict, List, Optional, Tuple, Union
 
 from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler, FileModifiedEvent
+from watchdog.observers.api import BaseObserver, ObservedWatch
+from watchdog.events import FileSystemEventHandler, FileSystemEvent, FileSystemMovedEvent
+
+from podap.model import Model
+from podap.config import Config
+from podap.stats import Stats
+
+
+class Debouncer:
+    """
+    Folds a burst of triggers into a single callback call, made once no new trigger arrived for quiet_window.
+
+    Triggers only push the deadline back, which is waited for by a single thread. The thread is started by the first
+    trigger and keeps running until cancelled.
+    """
+
+    def __init__(self, quiet_window: float, callback: Callable[[int], None]):
+        self.quiet_window = quiet_window
+        self.callback = callback
+        self.condition = threading.Condition()
+        self.thread = None  # type: Optional[threading.Thread]
+
+        # Monotonic time of the callback call, only set while there are pending triggers
+        self.deadline = None  # type: Optional[float]
+        self.pending = 0
+
+    def trigger(self):
+        with self.condition:
+            self.pending += 1
+            self.deadline = time.monotonic() + self.quiet_window
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name='podap-debouncer', daemon=True)
+                self.thread.start()
+            else:
+                # The thread may be waiting without any deadline
+                self.condition.notify()
+
+    def cancel(self):
+        """ Drop the pending triggers and let the thread finish """
+        with self.condition:
+            self.thread = None
+            self.deadline = None
+            self.pending = 0
+            self.condition.notify()
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while self.thread is threading.current_thread():
+                    if self.deadline is None:
+                        self.condition.wait()
+                        continue
+
+                    remaining = self.deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self.condition.wait(remaining)
+                else:
+                    # Cancelled, a new trigger is going to start a new thread
+                    return
+
+                count = self.pending
+                self.pending = 0
+                self.deadline = None
+
+            self.callback(count)
+
+
+class Poller:
+    """
+    Stand-in for the watchdog observer, for file systems without change notifications (e.g.: NFS or SMB): sweeps over
+    each of the scheduled directories with a single scandir call per interval, comparing the stat signatures of the
+    schedule files. All the directories are swept by a single thread.
+    """
+
+    def __init__(self, interval: float):
+        """
+        :param interval: Time between two sweeps, in seconds.
+        """
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, name='podap-poller', daemon=True)
+
+        # Keyed by the directory: called with the number of added, removed and changed files, once any of those is found
+        self.callbacks = {}  # type: Dict[str, Callable[[int], None]]
+        self.snapshots = {}  # type: Dict[str, Dict[str, Tuple[int, int, int]]]
+
+    @staticmethod
+    def take_snapshot(directory: str) -> Dict[str, Tuple[int, int, int]]:
+        snapshot = {}
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    if not Watcher.is_schedule_file(entry.name):
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    snapshot[entry.path] = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        except OSError:
+            # E.g.: the network share is gone, report the change once it is back
+            pass
+        return snapshot
+
+    def schedule(self, callback: Callable[[int], None], directory: str) -> str:
+        """ Start polling the directory, returns the watch to be passed to unschedule """
+        snapshot = Poller.take_snapshot(directory)
+        with self.lock:
+            self.callbacks[directory] = callback
+            self.snapshots[directory] = snapshot
+        return directory
+
+    def unschedule(self, directory: str):
+        with self.lock:
+            self.callbacks.pop(directory, None)
+            self.snapshots.pop(directory, None)
+
+    def _run(self):
+        while not self.stopped.wait(self.interval):
+            with self.lock:
+                directories = list(self.callbacks)
+
+            for directory in directories:
+                self._poll(directory)
+
+    def _poll(self, directory: str):
+        snapshot = Poller.take_snapshot(directory)
+        with self.lock:
+            callback = self.callbacks.get(directory)
+            old = self.snapshots.get(directory)
+            if callback is None or snapshot == old:
+                # Unchanged, or unscheduled in the meantime
+                return
+            self.snapshots[directory] = snapshot
+
+        changed = sum(1 for x in snapshot.keys() | old.keys() if snapshot.get(x) != old.get(x))
+        callback(changed)
 
-from podap.model import Model, DayEntry
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+
+    def join(self):
+        self.thread.join()
 
 
 class Watcher:
+    """
+    Reloads the model on changes of its working directory.
+
+    All the started watchers share a single observer (or a single poller), which only runs while any watcher is
+    started. The native observers still take a thread (two with inotify) per watched directory, so multiple working
+    directories are polled instead, all of them by a single thread (see get_backend).
+    """
+
+    # Hidden files, e.g.: the temporary copies some editors save to before renaming them over the original file. The
+    # other editor swap and backup files (0_mo.txt~, 0_mo.txt.swp, #0_mo.txt#, 4913) never match the schedule files.
+    IGNORED_PATTERNS = ('.*',)
+
+    # Observers shared by the started watchers, keyed by the backend, along with the number of their users
+    _observers = {}  # type: Dict[str, List]
+    _observers_lock = threading.Lock()
 
     class EventHandler(FileSystemEventHandler):
-        def __init__(self, model):
-            self.model = model
+        def __init__(self, watcher: 'Watcher'):
+            self.watcher = watcher
+            self.model = watcher.model
 
-        def on_modified(self, event):
-            if not isinstance(event, FileModifiedEvent):
-                # Assume that each directory change is a model change
-                self.model.changed_from_outside()
-                return
+        def _is_part_of_model(self, path: str) -> bool:
+            # Note: the files dictionary is only ever replaced as a whole, so it is safe to look into it from here
+            return path in self.model.files
 
-            is_part_of_model = False
-            path = event.src_path
-            for day_of_week in self.model.days:
-                day = self.model.days[day_of_week]  # type: DayEntry
-                if path == day.path:
-                    is_part_of_model = True
-                    break
+        @staticmethod
+        def _matches_pattern(path: str) -> bool:
+            return Watcher.is_schedule_file(os.path.basename(path))
 
-            if is_part_of_model:
-                self.model.changed_from_outside()
+        # Note: directory events are ignored, the working directory is not watched recursively, and any change of its
+        # contents is reported as a file event as well
+
+        def on_modified(self, event: FileSystemEvent):
+            if not event.is_directory and self._matches_pattern(event.src_path):
+                self.watcher.on_raw_event()
+
+        def on_created(self, event: FileSystemEvent):
+            if not event.is_directory and self._matches_pattern(event.src_path):
+                self.watcher.on_raw_event()
+
+        def on_deleted(self, event: FileSystemEvent):
+            if self._is_part_of_model(event.src_path) or \
+                    (not event.is_directory and self._matches_pattern(event.src_path)):
+                self.watcher.on_raw_event()
+
+        def on_moved(self, event: FileSystemMovedEvent):
+            # Editors often save by writing a temporary file and renaming it over the original one
+            if self._is_part_of_model(event.src_path) or \
+                    (not event.is_directory and self._matches_pattern(event.dest_path)):
+                self.watcher.on_raw_event()
 
     def __init__(self, model: Model):
         self.model = model
-        self.handler = Watcher.EventHandler(self.model)
-        self.observer = Observer()
-        self.observer.schedule(self.handler, path=self.model.working_directory)
+        self.handler = Watcher.EventHandler(self)
+        self.debouncer = Debouncer(Config.INSTANCE.reload_delay / 1000.0, self.on_burst)
+        self.backend = Watcher.get_backend()
+
+        # Only set while started
+        self.observer = None  # type: Optional[Union[BaseObserver, Poller]]
+        self.watch = None  # type: Optional[Union[ObservedWatch, str]]
+
+        # Number of raw events folded into each reload
+        self.on_reload_listeners = []  # type: List[Callable[[int], None]]
+        self.total_events = 0
+        self.total_reloads = 0
+
+    @staticmethod
+    def get_backend() -> str:
+        """ The backend chosen by the user, if any, otherwise multiple working directories are polled """
+        config = Config.INSTANCE
+        if config.watcher_backend is not None:
+            return config.watcher_backend
+        return Config.WATCHER_POLLING if len(config.working_directories) > 1 else Config.WATCHER_NATIVE
+
+    @staticmethod
+    def _acquire_observer(backend: str) -> Union[BaseObserver, Poller]:
+        """ Get the shared observer of the backend, starting it if this is its first user """
+        with Watcher._observers_lock:
+            shared = Watcher._observers.get(backend)
+            if shared is None:
+                if backend == Config.WATCHER_POLLING:
+                    observer = Poller(Config.INSTANCE.poll_interval / 1000.0)
+                else:
+                    observer = Observer()
+                observer.start()
+                shared = Watcher._observers[backend] = [observer, 0]
+
+            shared[1] += 1
+            return shared[0]
+
+    @staticmethod
+    def _release_observer(backend: str):
+        """ Stop the shared observer of the backend once its last user is gone """
+        with Watcher._observers_lock:
+            shared = Watcher._observers[backend]
+            shared[1] -= 1
+            if shared[1] != 0:
+                return
+            del Watcher._observers[backend]
+
+        # Observer threads can't be restarted, the next user is going to start a new one
+        observer = shared[0]
+        observer.stop()
+        observer.join()
+
+    @staticmethod
+    def is_schedule_file(name: str) -> bool:
+        """ Whether a file name matches the schedule files, and isn't hidden, same as the files loaded by the model """
+        if not fnmatch.fnmatch(name, Model.FILE_PATTERN):
+            return False
+
+        return not any(fnmatch.fnmatch(name, x) for x in Watcher.IGNORED_PATTERNS)
+
+    def subscribe_to_reloads(self, listener: Callable[[int], None]):
+        self.on_reload_listeners.append(listener)
+
+    def on_raw_event(self):
+        Stats.INSTANCE.count('watcher.events')
+        self.debouncer.trigger()
+
+    def on_burst(self, num_events: int):
+        self.total_events += num_events
+        self.total_reloads += 1
+        Stats.INSTANCE.count('watcher.reloads')
+        Stats.INSTANCE.observe('watcher.events_per_reload', num_events)
+        self.model.request_reload()
+
+        for listener in self.on_reload_listeners:
+            listener(num_events)
 
     def __enter__(self):
-        self.observer.start()
+        self.observer = Watcher._acquire_observer(self.backend)
+        if self.backend == Config.WATCHER_POLLING:
+            # Polling already batches all the changes within an interval, so there is nothing left to debounce
+            self.watch = self.observer.schedule(self.on_burst, self.model.working_directory)
+        else:
+            self.watch = self.observer.schedule(self.handler, path=self.model.working_directory)
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self.observer.stop()
-        self.observer.join()
+        self.observer.unschedule(self.watch)
+        self.debouncer.cancel()
+        Watcher._release_observer(self.backend)
+        self.observer = None
+        self.watch = None
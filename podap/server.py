@@ -0,0 +1,232 @@
+import asyncio
+import json
+import os
+import socket
+import stat
+import sys
+import threading
+import time
+
+from contextlib import nullcontext
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from podap.config import Config
+from podap.model import DayEntry, Model
+from podap.stats import Stats
+
+
+class QueryServer:
+    """
+    Answers the schedule queries of local clients (scripts, editor plugins) over a Unix domain socket (see --socket).
+
+    The protocol is line-based: each request is a single command on its own line, and each response is a single line
+    of compact JSON, either with the requested data or with an "error" key. A connection can be used for any number
+    of requests, e.g.: `echo current | socat - UNIX-CONNECT:/tmp/podap.sock`. Commands:
+    - current: the current task, whether it is a break, and the seconds until the next transition;
+    - next: the task after the current or the next break;
+    - day: entries of the current day, and the position of the active one;
+    - hash: hash of the loaded schedule, changing whenever any of the schedule files does.
+
+    The server runs its own asyncio loop on a separate thread, so it never blocks the GUI thread. The queries only read
+    the immutable schedule snapshot, which needs no locking.
+    """
+
+    # Longest accepted request line, in bytes
+    MAX_REQUEST_SIZE = 1024
+
+    # Pending connections, enough for bursts of clients connecting at once
+    BACKLOG = 1024
+
+    # Time given to a client to stop sending after its request was refused, so that the response is not lost to a reset
+    LINGER_S = 1.0
+
+    def __init__(self, model: Model, path: str):
+        self.model = model
+        self.path = path
+
+        self.commands = {
+            'current': self._current,
+            'next': self._next,
+            'day': self._day,
+            'hash': self._hash,
+        }  # type: Dict[str, Callable[[datetime], dict]]
+
+        self.loop = None  # type: Optional[asyncio.AbstractEventLoop]
+        self.server = None  # type: Optional[asyncio.AbstractServer]
+        self.thread = None  # type: Optional[threading.Thread]
+        self.started = threading.Event()
+        self.start_error = None  # type: Optional[BaseException]
+
+        # Serialized entries of the last queried day, which only change with the day or the schedule
+        self.day_entries = (None, [])  # type: Tuple[Optional[DayEntry], List[dict]]
+
+        # Handlers of the connected clients, only used by the server thread
+        self.clients = {}  # type: Dict[asyncio.Task, asyncio.StreamWriter]
+
+    def handle(self, command: str, now: Optional[datetime] = None) -> dict:
+        """ Answer a single request """
+        handler = self.commands.get(command)
+        if handler is None:
+            return {'error': f'unknown command: {command!r}, expected one of: {", ".join(self.commands)}'}
+
+        if not self.model.loaded:
+            return {'error': 'the schedule is not loaded yet'}
+
+        try:
+            return handler(now or datetime.now())
+        except ValueError as e:
+            return {'error': str(e)}
+
+    def _current(self, now: datetime) -> dict:
+        # Use a single snapshot, so that all the fields are consistent with each other
+        schedule = self.model.schedule
+        task = schedule.get_current_task(now)
+        return {'title': task.title, 'pause': schedule.is_on_break(now),
+                'remaining': max(round(schedule.get_time_remaining(now).total_seconds()), 0)}
+
+    def _next(self, now: datetime) -> dict:
+        return {'title': self.model.schedule.get_pending_task(now).title}
+
+    def _day(self, now: datetime) -> dict:
+        day = self.model.schedule.get_current_day(now)
+        active = day.timeline.get(now.hour * 60 + now.minute)
+
+        cached_day, entries = self.day_entries
+        if cached_day is not day:
+            entries = [{'start': f'{x.start_hour:02}:{x.start_minute:02}', 'duration': x.duration_minutes,
+                        'title': x.title} for x in day.entries]
+            self.day_entries = (day, entries)
+
+        return {'date': now.date().isoformat(), 'entries': entries,
+                'active': next((i for i, x in enumerate(day.entries) if x is active), None)}
+
+    def _hash(self, _: datetime) -> dict:
+        return {'hash': self.model.schedule.content_hash}
+
+    async def _serve_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        Stats.INSTANCE.count('server.connections')
+        self.clients[asyncio.current_task()] = writer
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+
+                start = time.perf_counter()
+                response = self.handle(line.decode(errors='replace').strip())
+                writer.write(QueryServer._encode(response))
+                Stats.INSTANCE.observe('server.request_ms', (time.perf_counter() - start) * 1000.0)
+
+                await writer.drain()
+        except ValueError:
+            # The request line is too long, there is no telling where the next one would start
+            Stats.INSTANCE.count('server.bad_requests')
+            await self._refuse(reader, writer, f'request is longer than {self.MAX_REQUEST_SIZE} bytes')
+        except ConnectionError:
+            pass
+        finally:
+            del self.clients[asyncio.current_task()]
+            writer.close()
+
+    @staticmethod
+    def _encode(response: dict) -> bytes:
+        return json.dumps(response, separators=(',', ':')).encode() + b'\n'
+
+    async def _refuse(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, message: str):
+        """ Send an error response and hang up, discarding anything the client still sends in the meantime """
+        async def discard():
+            while await reader.read(self.MAX_REQUEST_SIZE):
+                pass
+
+        try:
+            writer.write(QueryServer._encode({'error': message}))
+            writer.write_eof()
+            await writer.drain()
+            await asyncio.wait_for(discard(), self.LINGER_S)
+        except (ConnectionError, asyncio.TimeoutError):
+            pass
+
+    def _remove_stale_socket(self):
+        """ Remove the socket left behind by a previous run, refusing to take over the one of a running instance """
+        try:
+            if not stat.S_ISSOCK(os.stat(self.path).st_mode):
+                raise OSError(f'not a socket: {self.path}')
+        except FileNotFoundError:
+            return
+
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+            try:
+                s.connect(self.path)
+            except (ConnectionRefusedError, FileNotFoundError):
+                os.remove(self.path)
+                return
+
+        raise OSError(f'socket is already in use: {self.path}')
+
+    async def _serve(self):
+        try:
+            self._remove_stale_socket()
+            self.server = await asyncio.start_unix_server(self._serve_client, path=self.path,
+                                                          limit=self.MAX_REQUEST_SIZE, backlog=self.BACKLOG)
+            # Only the current user can query the schedule
+            os.chmod(self.path, 0o600)
+        except OSError as e:
+            self.start_error = e
+            return
+        finally:
+            self.started.set()
+
+        try:
+            await self.server.serve_forever()
+        except asyncio.CancelledError:
+            pass
+
+        # Disconnect the clients, their handlers are going to see the end of the stream
+        handlers = list(self.clients)
+        for writer in self.clients.values():
+            writer.close()
+        await asyncio.gather(*handlers, return_exceptions=True)
+
+    def _run(self):
+        self.loop = asyncio.new_event_loop()
+        try:
+            self.loop.run_until_complete(self._serve())
+        finally:
+            self.loop.close()
+
+    def start(self):
+        self.started.clear()
+        self.start_error = None
+        self.thread = threading.Thread(target=self._run, name='podap-server', daemon=True)
+        self.thread.start()
+        self.started.wait()
+        if self.start_error is not None:
+            self.thread.join()
+            self.thread = None
+            raise self.start_error
+
+    def stop(self):
+        if self.thread is None:
+            return
+
+        self.loop.call_soon_threadsafe(self.server.close)
+        self.thread.join()
+        self.thread = None
+
+        try:
+            os.remove(self.path)
+        except OSError as e:
+            print(f'Error removing the query socket: {e}', file=sys.stderr)
+
+    @staticmethod
+    def from_config(model: Model):
+        """ Server for the configured socket, or a no-op context manager if there is none """
+        path = Config.INSTANCE.socket_path
+        return nullcontext() if path is None else QueryServer(model, path)
+
+    def __enter__(self):
+        self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
@@ -0,0 +1,41 @@
+import sys
+import time
+
+from contextlib import contextmanager
+from typing import List, Set, Tuple
+
+
+class StartupProfiler:
+    """ Collects the durations of the startup phases (see --profile-startup) """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = []  # type: List[Tuple[str, float]]
+
+        # Marks still to be recorded before the profile is reported, see expect
+        self.expected = set()  # type: Set[str]
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - start))
+
+    def expect(self, *names: str):
+        """ Report the profile once all the given marks are recorded, in whichever order they come """
+        self.expected.update(names)
+
+    def mark(self, name: str):
+        """ Record a point in time (e.g.: the first paint), relative to the creation of the profiler """
+        self.phases.append((name, time.perf_counter() - self.started))
+        if name in self.expected:
+            self.expected.remove(name)
+            if not self.expected:
+                self.report()
+
+    def report(self, file=sys.stderr):
+        print('Startup profile:', file=file)
+        for name, duration in self.phases:
+            print(f'  {name:<30} {duration * 1000.0:9.1f} ms', file=file)
@@ -0,0 +1,134 @@
+import json
+import os
+import sys
+import threading
+import time
+
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+
+class Histogram:
+    """ Count, sum, extremes and power-of-two buckets of the observed values """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = None  # type: Optional[float]
+        self.max = None  # type: Optional[float]
+
+        # Bucket i counts the values in [2^(i-1), 2^i), bucket 0 the values below 1
+        self.buckets = []  # type: List[int]
+
+    def observe(self, value: float):
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+        bucket = 0 if value < 1 else int(value).bit_length()
+        if bucket >= len(self.buckets):
+            self.buckets.extend([0] * (bucket + 1 - len(self.buckets)))
+        self.buckets[bucket] += 1
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """ Upper bound of the bucket containing the given fraction of the values """
+        if self.count == 0:
+            return None
+
+        rank = fraction * self.count
+        seen = 0
+        for i, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank:
+                return min(float(1 << i), self.max)
+        return self.max
+
+    def to_dict(self) -> dict:
+        return {'count': self.count, 'sum': self.total, 'min': self.min, 'max': self.max,
+                'mean': self.total / self.count if self.count else None,
+                'p50': self.percentile(0.5), 'p99': self.percentile(0.99), 'buckets': self.buckets}
+
+
+class Stats:
+    """
+    Process-wide counters and histograms of the hot paths (see --stats).
+
+    Everything is a no-op unless enabled, so the calls can stay in the hot paths, costing an attribute check each.
+    Durations are recorded in milliseconds.
+    """
+
+    INSTANCE = None  # type: Optional['Stats']
+
+    # Enables the stats, same as --stats
+    ENVIRONMENT_VARIABLE = 'PODAP_STATS'
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.started = time.monotonic()
+        self.lock = threading.Lock()
+        self.counters = {}  # type: Dict[str, int]
+        self.histograms = {}  # type: Dict[str, Histogram]
+
+    @staticmethod
+    def enabled_by_environment() -> bool:
+        return os.environ.get(Stats.ENVIRONMENT_VARIABLE, '') not in ('', '0')
+
+    def count(self, name: str, value: int = 1):
+        if not self.enabled:
+            return
+
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name: str, value: float):
+        if not self.enabled:
+            return
+
+        with self.lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.observe(value)
+
+    @contextmanager
+    def timer(self, name: str):
+        """ Observe the duration of the block, in milliseconds """
+        if not self.enabled:
+            yield
+            return
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, (time.perf_counter() - start) * 1000.0)
+
+    def to_dict(self) -> dict:
+        with self.lock:
+            return {'uptime_s': time.monotonic() - self.started,
+                    'counters': dict(sorted(self.counters.items())),
+                    'histograms': {name: x.to_dict() for name, x in sorted(self.histograms.items())}}
+
+    def format(self) -> str:
+        """ Human-readable summary, one line per counter or histogram """
+        data = self.to_dict()
+        lines = [f'uptime {data["uptime_s"]:.0f} s']
+        for name, value in data['counters'].items():
+            lines.append(f'{name:<28} {value:>8}')
+        for name, x in data['histograms'].items():
+            lines.append(f'{name:<28} {x["count"]:>8}  mean {x["mean"]:.3f}  p99 <= {x["p99"]:.3g}  max {x["max"]:.3f}')
+        return '\n'.join(lines)
+
+    def dump(self, path: Optional[str] = None):
+        """ Write the stats as JSON to the given file, or to stderr """
+        if path is None:
+            json.dump(self.to_dict(), sys.stderr, indent=2)
+            print(file=sys.stderr)
+            return
+
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+
+Stats.INSTANCE = Stats()
@@ -1,31 +1,45 @@
+import hashlib
+import os
 import sys
 
+from contextlib import ExitStack, nullcontext
+from typing import List, Optional
+
 from PySide6.QtGui import QMouseEvent, QCloseEvent
 
-from podap.model import Model, Watcher
+from podap.model import Model, ParseCache, Watcher
 from podap.view import QuickAccess
 from podap.config import Config
+from podap.startup_profiler import StartupProfiler
+from podap.view.clock import Clock
+from podap.view.dispatcher import Dispatcher
 from podap.view.tasks_view import TasksView
 
-from PySide6.QtCore import QTimer, Qt, QPoint, QSettings
+from PySide6.QtCore import QTimer, Qt, QPoint, QSettings, QObject, QEvent
 from PySide6.QtWidgets import QApplication, QHBoxLayout, QMainWindow, QWidget, QSizePolicy
 
 
 class MainWindow(QMainWindow):
     UI_VERSION = 1
 
-    def __init__(self, model: Model, **kwargs):
+    def __init__(self, model: Model, settings_group: str = '', **kwargs):
+        """
+        :param settings_group: Keeps the position and the state of each window apart, when showing multiple schedules.
+        """
         super().__init__(**kwargs)
 
         self.model = model
+        self.settings_group = settings_group
         self.setContentsMargins(0, 0, 0, 0)
 
-        self.quick_access = QuickAccess(self.model)
+        self.clock = Clock(self.model, self)
+
+        self.quick_access = QuickAccess(self.model, self.clock)
         self.quick_access.collape_tasks.connect(self.update_tasks_visibility)
         self.quick_access.setSizePolicy(QSizePolicy.Preferred, QSizePolicy.Preferred)
         self.quick_access.should_close.connect(self.handle_close)
 
-        self.task_view = TasksView(model)
+        self.task_view = TasksView(model, self.clock)
         self.task_view.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Preferred)
         self.task_view.error_message.clicked.connect(self.error_message_clicked)
 
@@ -34,6 +48,9 @@ class MainWindow(QMainWindow):
         self.old_size = self.size()
         self.collapsed = False
 
+        # Whether the window was shown before, see _restore_position
+        self.has_saved_geometry = False
+
         main_layout = QHBoxLayout()
         main_layout.addWidget(self.quick_access)
         main_layout.addWidget(self.task_view)
@@ -110,10 +127,20 @@ class MainWindow(QMainWindow):
             shrink = self.shrink_to_old_size
 
         self.task_view.setVisible(not should_hide)
+        self.update_activity()
 
         # Note: see error_message_clicked for description
         QTimer.singleShot(0, shrink)
 
+    def update_activity(self):
+        """ Only keep the tasks ticking while they can actually be seen """
+        self.task_view.set_active(not self.collapsed and not self.isMinimized())
+
+    def changeEvent(self, event: QEvent) -> None:
+        super().changeEvent(event)
+        if event.type() == QEvent.WindowStateChange:
+            self.update_activity()
+
     def closeEvent(self, event: QCloseEvent) -> None:
         self._save_position()
 
@@ -124,8 +151,30 @@ class MainWindow(QMainWindow):
     def make_settings() -> QSettings:
         return QSettings('Dennis Sitelew', 'podap')
 
-    def _save_position(self):
+    def _make_window_settings(self) -> QSettings:
         settings = self.make_settings()
+        if self.settings_group:
+            settings.beginGroup(self.settings_group)
+        return settings
+
+    @staticmethod
+    def get_settings_group(working_directory: str, index: int) -> str:
+        """ The first window keeps the top-level settings, the other ones get a group per working directory """
+        if index == 0:
+            return ''
+        key = hashlib.blake2b(os.path.abspath(working_directory).encode(), digest_size=8).hexdigest()
+        return f'window-{key}'
+
+    @staticmethod
+    def make_parse_cache(working_directory: str) -> ParseCache:
+        """ Parse cache of the working directory, stored next to the settings """
+        # Note: native settings may live in the registry, while the INI ones are always a file in the same location
+        settings = QSettings(QSettings.IniFormat, QSettings.UserScope, 'Dennis Sitelew', 'podap')
+        key = hashlib.blake2b(os.path.abspath(working_directory).encode(), digest_size=8).hexdigest()
+        return ParseCache(os.path.join(os.path.dirname(settings.fileName()), f'podap-cache-{key}.json'))
+
+    def _save_position(self):
+        settings = self._make_window_settings()
         settings.setValue('geometry', self.saveGeometry())
         settings.setValue('state', self.saveState(self.UI_VERSION))
         settings.setValue('collapsed', self.collapsed)
@@ -133,34 +182,117 @@ class MainWindow(QMainWindow):
         settings.setValue('borderless', self.borderless)
 
     def _restore_position(self):
-        settings = self.make_settings()
-        self.restoreGeometry(settings.value('geometry'))
+        settings = self._make_window_settings()
+        geometry = settings.value('geometry')
+        self.has_saved_geometry = geometry is not None
+        self.restoreGeometry(geometry)
         self.restoreState(settings.value('state'), self.UI_VERSION)
 
-        self.collapsed = settings.value('collapsed', False)
+        self.collapsed = settings.value('collapsed', False, type=bool)
         self.quick_access.setup_hide_button(self.collapsed)
         if self.collapsed:
             self.update_tasks_visibility(True)
 
         self.old_size = settings.value('old_size', None)
-        self.borderless = settings.value('borderless', False)
+        self.borderless = settings.value('borderless', False, type=bool)
 
     # def do_save_image(self):
     #     # NOTE: Reference for saving UI as an image
     #     self.grab().save('screen.png')
 
 
+class FirstPaintFilter(QObject):
+    """ Application-wide event filter, recording the first paint event in the startup profile """
+
+    MARK = 'first paint (since start)'
+
+    def __init__(self, profiler: StartupProfiler, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.profiler = profiler
+
+    def eventFilter(self, watched: QObject, event: QEvent) -> bool:
+        if event.type() == QEvent.Paint:
+            QApplication.instance().removeEventFilter(self)
+            self.profiler.mark(FirstPaintFilter.MARK)
+        return False
+
+
 class PodapApp:
+    # The models are only loaded in the background, after the Model() phase
+    SCHEDULES_MARK = 'schedules loaded (since start)'
 
     @staticmethod
-    def run():
-        app = QApplication(sys.argv)
+    def _mark_schedules_loaded(profiler: StartupProfiler, models: List[Model]):
+        """ Record the time by which all the models have either published their first schedule or failed to load """
+        pending = set(models)
+
+        def on_loaded(model: Model, _):
+            if model not in pending:
+                return
+            pending.remove(model)
+            if not pending:
+                profiler.mark(PodapApp.SCHEDULES_MARK)
+
+        for model in models:
+            model.subscribe_to_changes(on_loaded)
+            model.subscribe_to_errors(on_loaded)
 
-        model = Model()
+    @staticmethod
+    def run(profiler: Optional[StartupProfiler] = None):
+        def phase(name: str):
+            return nullcontext() if profiler is None else profiler.phase(name)
+
+        app = QApplication(sys.argv)
 
-        with Watcher(model=model):
-            widget = MainWindow(model=model)
-            widget.show()
+        first_paint_filter = None
+        if profiler is not None:
+            profiler.expect(FirstPaintFilter.MARK, PodapApp.SCHEDULES_MARK)
+            first_paint_filter = FirstPaintFilter(profiler)
+            app.installEventFilter(first_paint_filter)
+
+        # Model notifications are delivered on the GUI thread, no matter which thread reloaded the model
+        dispatcher = Dispatcher()
+
+        # The schedules are loaded in the background, while the windows are shown in the loading state. All the models
+        # share the dispatcher, the reloading threads and the watcher thread.
+        directories = Config.INSTANCE.working_directories
+        with phase('Model()'):
+            models = []  # type: List[Model]
+            for directory in directories:
+                cache = MainWindow.make_parse_cache(directory)
+                models.append(Model(dispatcher=dispatcher, load=False, cache=cache, working_directory=directory))
+                models[-1].request_reload()
+
+        # Notifications are only delivered by the event loop, so none of them can be missed
+        if profiler is not None:
+            PodapApp._mark_schedules_loaded(profiler, models)
+
+        # Imported here, because the server pulls in asyncio
+        from podap.server import QueryServer
+
+        with ExitStack() as stack:
+            for model in models:
+                stack.enter_context(Watcher(model=model))
+            try:
+                stack.enter_context(QueryServer.from_config(models[0]))
+            except OSError as e:
+                # E.g.: another instance is already serving the socket
+                print(f'Error serving queries on {Config.INSTANCE.socket_path}: {e}', file=sys.stderr)
+                sys.exit(1)
+
+            # One window per schedule, side by side
+            with phase('MainWindow()'):
+                windows = []  # type: List[MainWindow]
+                for i, model in enumerate(models):
+                    settings_group = MainWindow.get_settings_group(model.working_directory, i)
+                    window = MainWindow(model=model, settings_group=settings_group)
+                    if len(models) > 1:
+                        window.setWindowTitle(os.path.basename(os.path.normpath(model.working_directory)))
+                    if windows and not window.has_saved_geometry:
+                        # Shown for the first time, open it next to the previous window instead of on top of it
+                        window.move(windows[-1].frameGeometry().topRight() + QPoint(1, 0))
+                    window.show()
+                    windows.append(window)
             res = app.exec()
 
         sys.exit(res)
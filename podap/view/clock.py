@@ -0,0 +1,107 @@
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from typing import Iterable, List, Set
+
+from PySide6.QtCore import QObject, QTimer, Qt, Signal
+
+from podap.model import Model, ModelChange
+from podap.stats import Stats
+
+
+class Clock(QObject):
+    """
+    Shared scheduler for all the time-dependent widgets.
+
+    Instead of polling, the clock arms a single-shot timer for the next transition of the model (start or end of a
+    break, entry boundary) or one of the registered minute marks (e.g.: blinking) and emits `transition` once it is
+    reached. The timer is re-armed on every model change, since the entry boundaries depend on the schedule files.
+
+    The per-second `tick` signal is only running while at least one widget has requested it (e.g.: to show the time).
+    """
+
+    transition = Signal()
+    tick = Signal()
+
+    TICK_INTERVAL_MS = 1000
+
+    # Wake up at least this often, so that we recover from system clock changes and sleep/resume in a timely manner
+    MAX_INTERVAL_MS = 15 * 60 * 1000
+
+    # Fire slightly after the transition, so that the widgets are guaranteed to see the new state
+    SLACK_MS = 20
+
+    def __init__(self, model: Model, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.model = model
+        self.minute_marks = []  # type: List[int]
+        self.tick_requests = set()  # type: Set[object]
+
+        self.transition_timer = QTimer(self)
+        self.transition_timer.setSingleShot(True)
+        self.transition_timer.setTimerType(Qt.PreciseTimer)
+        self.transition_timer.timeout.connect(self._on_transition)
+
+        self.tick_timer = QTimer(self)
+        self.tick_timer.setSingleShot(True)
+        self.tick_timer.setTimerType(Qt.PreciseTimer)
+        self.tick_timer.timeout.connect(self._on_tick)
+
+        self.model.subscribe_to_changes(self.on_model_change)
+        self._arm()
+
+    def on_model_change(self, _, __: ModelChange):
+        self._arm()
+
+    def add_minute_marks(self, minutes: Iterable[int]):
+        """ Request an additional transition at the start of each of the given minutes of every day """
+        self.minute_marks = sorted(set(self.minute_marks).union(minutes))
+        self._arm()
+
+    def request_ticks(self, owner: object, enabled: bool):
+        """ Start or stop the per-second ticks on behalf of owner. Ticks run while at least one owner needs them """
+        if enabled:
+            self.tick_requests.add(owner)
+        else:
+            self.tick_requests.discard(owner)
+
+        if self.tick_requests and not self.tick_timer.isActive():
+            self._arm_tick()
+        elif not self.tick_requests and self.tick_timer.isActive():
+            self.tick_timer.stop()
+
+    def _next_minute_mark(self, now: datetime) -> datetime:
+        midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        i = bisect_right(self.minute_marks, now.hour * 60 + now.minute)
+        if i < len(self.minute_marks):
+            return midnight + timedelta(minutes=self.minute_marks[i])
+
+        # The first mark of the next day, if any
+        return midnight + timedelta(days=1, minutes=self.minute_marks[0] if self.minute_marks else 0)
+
+    def _arm(self):
+        now = datetime.now()
+        next_transition = min(self.model.get_next_transition(now), self._next_minute_mark(now))
+
+        interval_ms = int((next_transition - now).total_seconds() * 1000) + self.SLACK_MS
+        self.transition_timer.start(min(interval_ms, self.MAX_INTERVAL_MS))
+
+    def _arm_tick(self):
+        # Align the ticks with the second boundaries, so that a displayed clock doesn't lag behind
+        now = datetime.now()
+        self.tick_timer.start(self.TICK_INTERVAL_MS - now.microsecond // 1000 + self.SLACK_MS)
+
+    def _on_tick(self):
+        if Stats.INSTANCE.enabled:
+            Stats.INSTANCE.count('clock.ticks')
+            for owner in self.tick_requests:
+                Stats.INSTANCE.count(f'clock.ticks.{type(owner).__name__}')
+
+        self.tick.emit()
+        if self.tick_requests:
+            self._arm_tick()
+
+    def _on_transition(self):
+        Stats.INSTANCE.count('clock.transitions')
+        self.transition.emit()
+        self._arm()
@@ -1,24 +1,31 @@
-from typing import List
+from typing import Iterable, List, Optional
 
-from PySide6.QtCore import QTimer, Qt
+from PySide6.QtCore import Qt
 from PySide6.QtGui import QPalette, QColor
 
 from datetime import datetime
 
+from podap.model.tokenizer import MINUTES_PER_DAY
+from podap.view.clock import Clock
 from podap.view.scalable_label import ScalableLabel
 
 
 class CurrentTask(ScalableLabel):
-    """ Displays the current task and flashes with warning_colors at the given blink_minutes """
+    """
+    Displays the current task and flashes with warning_colors during the given blink_minutes of the day, by default
+    during the first minute of each break and of each work part after a break.
+    """
 
-    def __init__(self, text: str, blink_minutes: List[int] = None, warning_colors: List[int] = None, *args, **kwargs):
+    def __init__(self, text: str, clock: Clock, blink_minutes: Optional[Iterable[int]] = None,
+                 warning_colors: List[int] = None, *args, **kwargs):
         super().__init__(text, *args, **kwargs)
 
         if warning_colors is None:
             warning_colors = [QColor.fromRgb(255, 0, 0), QColor.fromRgb(255, 255, 0)]
 
         if blink_minutes is None:
-            blink_minutes = [0, 45]
+            breaks = clock.model.breaks
+            blink_minutes = [x % MINUTES_PER_DAY for x in breaks.starts + breaks.ends]
 
         self.warnings_colors = []
         for color in warning_colors:
@@ -26,7 +33,7 @@ class CurrentTask(ScalableLabel):
             palette.setColor(QPalette.Window, color)
             self.warnings_colors.append(palette)
 
-        self.blink_minutes = blink_minutes
+        self.blink_minutes = frozenset(blink_minutes)
         self.setAlignment(Qt.AlignCenter)
 
         self.setAutoFillBackground(True)
@@ -34,16 +41,49 @@ class CurrentTask(ScalableLabel):
 
         self.setContentsMargins(0, 0, 0, 0)
 
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.on_tick)
-        self.timer.start(500)
+        self.blinking = False
+
+        # Nothing is updated while inactive (e.g.: collapsed or minimized), see set_active
+        self.active = True
+        self.current_palette = None  # type: Optional[QPalette]
+
+        # Blinking starts at the beginning of each blink minute and stops at the beginning of the next one
+        self.clock = clock
+        self.clock.add_minute_marks(self.blink_minutes)
+        self.clock.add_minute_marks((x + 1) % MINUTES_PER_DAY for x in self.blink_minutes)
+        self.clock.transition.connect(self.on_transition)
+        self.clock.tick.connect(self.on_tick)
+        self.on_transition()
+
+    def set_active(self, active: bool):
+        """ Stop or resume the updates, resyncing with the current time on resume """
+        self.active = active
+        if active:
+            self.on_transition()
+        else:
+            self.clock.request_ticks(self, False)
+
+    def on_transition(self):
+        if not self.active:
+            return
+
+        now = datetime.now()
+        self.blinking = now.hour * 60 + now.minute in self.blink_minutes
+        self.clock.request_ticks(self, self.blinking)
+        self.update_palette()
 
     def on_tick(self):
+        if self.active and self.blinking:
+            self.update_palette()
+
+    def update_palette(self):
         # Check whether we have to change the background
-        now = datetime.now()
-        if now.minute in self.blink_minutes:
-            palette = self.warnings_colors[now.second % len(self.warnings_colors)]
+        if self.blinking:
+            palette = self.warnings_colors[datetime.now().second % len(self.warnings_colors)]
         else:
             palette = self.default_palette
 
-        self.setPalette(palette)
+        # Setting a palette propagates to the children and triggers a repaint, even if it is the same one
+        if palette is not self.current_palette:
+            self.current_palette = palette
+            self.setPalette(palette)
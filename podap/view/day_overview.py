@@ -1,161 +1,193 @@
-from typing import List, Optional
+from typing import Iterable, Optional
 
-from PySide6.QtCore import QTimer
-from PySide6.QtGui import QPalette, QColor
-from PySide6.QtWidgets import QVBoxLayout, QHBoxLayout, QLabel, QSizePolicy, QWidget
+from PySide6.QtCore import QRect, QSize, Qt
+from PySide6.QtGui import QColor, QFont, QFontMetrics, QPainter, QPaintEvent, QShowEvent
+from PySide6.QtWidgets import QWidget
 
-from podap.model import DayEntry, Model
-from podap.view.styles import DEFAULT_BOLD_STYLE, DEFAULT_STYLE
+from podap.model import DayEntry, DayOfWeek, Model, ModelChange
+from podap.view.clock import Clock
 
 from datetime import datetime
 
 
 class DayOverview(QWidget):
-    UPDATE_INTERVAL_MS = 2000  # Update every 10 seconds
+    """
+    Entries of the current day, one row per entry, with the active entry highlighted.
 
-    def __init__(self, model: Model, *args, **kwargs):
+    All the rows are painted by this single widget, so the number of widgets doesn't depend on the schedule size, and
+    changing the active entry only repaints the two affected rows.
+    """
+
+    # Horizontal and vertical padding of each cell
+    H_MARGIN = 16
+    V_MARGIN = 4
+
+    def __init__(self, model: Model, clock: Clock, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
         self.model = model
+        self.clock = clock
         self.current_day = None  # type: Optional[DayEntry]
         self.active_entry_idx = None  # type: Optional[int]
         self.bold_active_entry = False
 
-        layout = QHBoxLayout(self)
-        layout.setContentsMargins(0, 0, 0, 0)
-
         self.active_color = QColor.fromRgb(0xCB4B16)
-        self.active_palette = QPalette()
-        self.active_palette.setColor(QPalette.Window, self.active_color)
-        self.default_style = self.styleSheet()
-
         self.background_colors = [QColor.fromRgb(0xEEE8D5), QColor.fromRgb(0xFDF6E3)]
-        self.background_palettes = []
-        for x in self.background_colors:
-            palette = QPalette()
-            palette.setColor(QPalette.Window, x)
-            self.background_palettes.append(palette)
 
-        layout.setSpacing(0)
+        self.bold_font = QFont(self.font())
+        self.bold_font.setBold(True)
 
-        self.left_half = QVBoxLayout()
-        self.right_half = QVBoxLayout()
+        # Row layout, recomputed for each new day
+        self.row_height = 0
+        self.hour_width = 0
+        self.title_width = 0
+        self._update_metrics()
 
-        self.hours = []  # type: List[QLabel]
-        self.titles = []  # type: List[QLabel]
-
-        layout.addLayout(self.left_half)
-        layout.addLayout(self.right_half)
-
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self._update)
-        self.timer.start(DayOverview.UPDATE_INTERVAL_MS)
+        # Both the day and the active entry can only change at the entry boundaries
+        self.clock.transition.connect(self._update)
 
         self.model.subscribe_to_changes(self.on_model_change)
 
         self._update()
 
-    def on_model_change(self, _):
-        # TODO: This may be called from the watcher thread, but I'm to lazy to work this stuff around (signals etc)
-        self.force_update()
+    def detach(self):
+        """ Stop following the model and the clock, e.g.: before being destroyed """
+        self.clock.transition.disconnect(self._update)
+        self.model.unsubscribe_from_changes(self.on_model_change)
 
-    def force_update(self):
-        """ Update the whole window (e.g.: in case of model change) """
-        # TODO: Error handling is missing
-        new_day = self.model.get_current_day()
-        self._reset_for_day(new_day)
-        self.current_day = new_day
+    def on_model_change(self, _, change: ModelChange):
+        today = DayOfWeek.today()
+        if not change.affects(today) or not self.isVisible():
+            return
 
-        new_entry_idx = datetime.now().hour
-        self._update_active_entry(new_entry_idx)
-        self.active_entry_idx = new_entry_idx
+        # Only repaint the changed rows, if it's known which ones of the displayed day those are
+        changed_entries = None
+        day_change = None if change.calendar_changed else change.days.get(today)
+        if day_change is not None and day_change.new is self.model.get_current_day():
+            changed_entries = day_change.changed_entries
 
-    def _update(self):
-        """ Update the current day and hour entry based on the current time """
-        # TODO: Error handling is missing
-        new_day = self.model.get_current_day()
-        if self.current_day is None or self.current_day != new_day:
-            self._reset_for_day(new_day)
-            self.current_day = new_day
-
-        new_entry_idx = datetime.now().hour
-        if self.active_entry_idx is None or self.active_entry_idx != new_entry_idx:
-            self._update_active_entry(new_entry_idx)
-            self.active_entry_idx = new_entry_idx
-
-    def _reset_for_day(self, day: DayEntry):
-        """ Update all labels to show the current day """
-        self._ensure_num_labels(len(day.entries))
-        for i in range(len(day.entries)):
-            entry = day.entries[i]
-            self.hours[i].setText(f'{entry.start_hour:02}:00')
-            self.titles[i].setText(f'{entry.title}')
-
-    @staticmethod
-    def _deactivate_label(label: QLabel, palette: QPalette):
-        """ Mark a label as non-active (default color, not bold) """
-        label.setStyleSheet(DEFAULT_STYLE)
-        label.setPalette(palette)
-        label.show()
-
-    def _activate_label(self, label: QLabel):
-        """ Mark a label as active (active color, bold) """
-        if self.bold_active_entry:
-            label.setStyleSheet(DEFAULT_BOLD_STYLE)
-
-        label.setPalette(self.active_palette)
-        label.show()
-
-    def _update_active_entry(self, new_idx: int):
-        """ Update the currently active entry """
-        if self.active_entry_idx is not None:
-            palette = self.background_palettes[self.active_entry_idx % len(self.background_palettes)]
-
-            self._deactivate_label(self.hours[self.active_entry_idx], palette)
-            self._deactivate_label(self.titles[self.active_entry_idx], palette)
-
-        self._activate_label(self.hours[new_idx])
-        self._activate_label(self.titles[new_idx])
-
-    def _ensure_num_labels(self, count: int):
+        self.force_update(changed_entries)
+
+    def force_update(self, changed_entries: Optional[Iterable[int]] = None):
         """
-        Make sure that this widget has at least count visible labels either by adding missing labels or by adjusting
-        their visibility.
+        Update the whole window (e.g.: in case of model change)
 
-        :param count: Desired number of labels.
-        :return: None
+        :param changed_entries: Positions of the changed entries, if known, to only repaint their rows.
         """
+        if not self.model.loaded or not self.isVisible():
+            # Hidden overview is brought up to date once shown
+            return
 
-        # First add missing labels
-        extra_labels = len(self.hours) - count
-        if extra_labels < 0:
-            self._add_extra_labels(-extra_labels)
+        now = datetime.now()
+        try:
+            day = self.model.get_current_day()
+        except ValueError:
+            self._clear()
+            return
 
-        # Adjust visibility
-        for i in range(len(self.hours)):
-            is_visible = True if i < count else False
-            self.hours[i].setVisible(is_visible)
-            self.titles[i].setVisible(is_visible)
+        self._set_day(day, changed_entries)
+        self._set_active_entry(self._find_active_entry(now))
 
-    def _add_extra_labels(self, count: int):
-        for i in range(count):
-            palette = self.background_palettes[len(self.hours) % len(self.background_palettes)]
+    def _update(self):
+        """ Update the current day and hour entry based on the current time """
+        if not self.model.loaded or not self.isVisible():
+            return
 
-            def setup_label(label):
-                label.setPalette(palette)
-                label.setAutoFillBackground(True)
-                label.setContentsMargins(16, 4, 16, 4)
+        now = datetime.now()
+        try:
+            new_day = self.model.get_current_day()
+        except ValueError:
+            self._clear()
+            return
 
-            hour = QLabel(f'hour {len(self.hours)}')
-            hour.setSizePolicy(QSizePolicy.Preferred, QSizePolicy.Preferred)
-            setup_label(hour)
+        if self.current_day is None or self.current_day is not new_day:
+            self._set_day(new_day)
 
-            title = QLabel(f'title {len(self.hours)}')
-            title.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Preferred)
-            setup_label(title)
+        self._set_active_entry(self._find_active_entry(now))
 
-            self.left_half.addWidget(hour)
-            self.right_half.addWidget(title)
+    def showEvent(self, event: QShowEvent):
+        super().showEvent(event)
+        self.force_update()
 
-            self.hours.append(hour)
-            self.titles.append(title)
+    def _find_active_entry(self, now: datetime) -> Optional[int]:
+        """ Position of the entry covering the current minute (the first one wins, same as for the task lookups) """
+        active = self.current_day.timeline.get(now.hour * 60 + now.minute)
+        if active is None:
+            return None
+
+        # Entries are compared by identity, equal entries may appear more than once
+        return next(i for i, entry in enumerate(self.current_day.entries) if entry is active)
+
+    def _clear(self):
+        """ Show no entries, e.g.: if there is no schedule for today, rather than keep showing the previous day """
+        self._set_active_entry(None)
+        if self.current_day is not None:
+            self._set_day(None)
+
+    def _set_day(self, day: Optional[DayEntry], changed_entries: Optional[Iterable[int]] = None):
+        old_day = self.current_day
+        self.current_day = day
+
+        old_size = self.sizeHint()
+        self._update_metrics()
+        if self.sizeHint() != old_size:
+            self.updateGeometry()
+            self.setMinimumSize(self.sizeHint())
+            self.resize(self.sizeHint())
+            self.update()
+        elif old_day is None or changed_entries is None:
+            self.update()
+        else:
+            for i in changed_entries:
+                self.update(self._row_rect(i))
+
+    def _set_active_entry(self, new_idx: Optional[int]):
+        if new_idx == self.active_entry_idx:
+            return
+
+        for i in (self.active_entry_idx, new_idx):
+            if i is not None:
+                self.update(self._row_rect(i))
+        self.active_entry_idx = new_idx
+
+    def _update_metrics(self):
+        metrics = QFontMetrics(self.bold_font)
+        titles = set() if self.current_day is None else {x.title for x in self.current_day.entries}
+
+        self.row_height = metrics.height() + 2 * self.V_MARGIN
+        self.hour_width = metrics.horizontalAdvance('00:00') + 2 * self.H_MARGIN
+        self.title_width = max((metrics.horizontalAdvance(x) for x in titles), default=0) + 2 * self.H_MARGIN
+
+    def _num_rows(self) -> int:
+        return 0 if self.current_day is None else len(self.current_day.entries)
+
+    def _row_rect(self, row: int) -> QRect:
+        return QRect(0, row * self.row_height, self.width(), self.row_height)
+
+    def sizeHint(self) -> QSize:
+        return QSize(self.hour_width + self.title_width, self._num_rows() * self.row_height)
+
+    def paintEvent(self, event: QPaintEvent):
+        if self.current_day is None:
+            return
+
+        painter = QPainter(self)
+        clip = event.rect()
+        first = max(clip.top() // self.row_height, 0)
+        last = min(clip.bottom() // self.row_height, self._num_rows() - 1)
+
+        hour_width = self.hour_width
+        title_width = max(self.width() - hour_width, 0)
+        for i in range(first, last + 1):
+            entry = self.current_day.entries[i]
+            is_active = i == self.active_entry_idx
+            top = i * self.row_height
+
+            color = self.active_color if is_active else self.background_colors[i % len(self.background_colors)]
+            painter.fillRect(0, top, self.width(), self.row_height, color)
+
+            painter.setFont(self.bold_font if is_active and self.bold_active_entry else self.font())
+            painter.drawText(QRect(self.H_MARGIN, top, hour_width - 2 * self.H_MARGIN, self.row_height),
+                             Qt.AlignLeft | Qt.AlignVCenter, f'{entry.start_hour:02}:{entry.start_minute:02}')
+            painter.drawText(QRect(hour_width + self.H_MARGIN, top, title_width - 2 * self.H_MARGIN, self.row_height),
+                             Qt.AlignLeft | Qt.AlignVCenter, entry.title)
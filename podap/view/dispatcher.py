@@ -0,0 +1,23 @@
+from typing import Callable
+
+from PySide6.QtCore import QObject, Signal
+
+
+class Dispatcher(QObject):
+    """
+    Runs the posted callables on the thread this object lives in (i.e.: the GUI thread). Callables posted from that
+    very thread are run immediately, the ones posted from other threads are queued.
+    """
+
+    posted = Signal(object)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.posted.connect(self._run)
+
+    def __call__(self, fn: Callable[[], None]):
+        self.posted.emit(fn)
+
+    @staticmethod
+    def _run(fn: Callable[[], None]):
+        fn()
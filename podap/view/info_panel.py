@@ -0,0 +1,72 @@
+from PySide6.QtCore import QTimer, Qt, Signal
+from PySide6.QtGui import QCloseEvent, QFontDatabase, QHideEvent, QShowEvent
+from PySide6.QtWidgets import QLabel, QVBoxLayout, QWidget
+
+from podap.model import Model
+from podap.stats import Stats
+from podap.view.clock import Clock
+from podap.view.day_overview import DayOverview
+
+
+class StatsView(QLabel):
+    """ Live view of the collected stats, only refreshed while visible """
+
+    REFRESH_INTERVAL_MS = 1000
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.setFont(QFontDatabase.systemFont(QFontDatabase.FixedFont))
+        self.setContentsMargins(4, 4, 4, 4)
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(self.REFRESH_INTERVAL_MS)
+        self.timer.timeout.connect(self.refresh)
+
+    def refresh(self):
+        self.setText(Stats.INSTANCE.format())
+
+        # New counters show up over time, grow the window along with them
+        hint = self.sizeHint()
+        if hint.width() > self.width() or hint.height() > self.height():
+            self.window().adjustSize()
+
+    def showEvent(self, event: QShowEvent):
+        super().showEvent(event)
+        self.refresh()
+        self.timer.start()
+
+    def hideEvent(self, event: QHideEvent):
+        super().hideEvent(event)
+        self.timer.stop()
+
+
+class InfoPanel(QWidget):
+    """
+    Window opened by the info button: the overview of the current day, and the stats if enabled (see --stats).
+
+    The panel is only created once opened, and destroyed once closed, along with its model subscription.
+    """
+
+    closed = Signal()
+
+    def __init__(self, model: Model, clock: Clock, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.setAttribute(Qt.WA_DeleteOnClose)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(0)
+
+        self.day_overview = DayOverview(model, clock)
+        layout.addWidget(self.day_overview)
+
+        self.stats_view = None
+        if Stats.INSTANCE.enabled:
+            self.stats_view = StatsView()
+            layout.addWidget(self.stats_view)
+
+    def closeEvent(self, event: QCloseEvent):
+        super().closeEvent(event)
+        self.day_overview.detach()
+        self.closed.emit()
@@ -1,14 +1,14 @@
+from typing import Optional
+
 from PySide6.QtCore import Signal
 from PySide6.QtWidgets import QHBoxLayout, QPushButton, QWidget, QVBoxLayout
 
-from podap.view import DayOverview
-
 
 class QuickAccess(QWidget):
     collape_tasks = Signal(bool)
     should_close = Signal()
 
-    def __init__(self, model, *args, **kwargs):
+    def __init__(self, model, clock, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
         self.main_layout = QVBoxLayout(self)
@@ -22,8 +22,10 @@ class QuickAccess(QWidget):
 
         self.button_layout.setSpacing(7)
         self.model = model
+        self.clock = clock
 
-        self.info = DayOverview(model)
+        # Only exists while open, most of the time nobody looks at it
+        self.info = None  # type: Optional['InfoPanel']
 
         def make_button(text: str):
             btn = QPushButton(text)
@@ -46,10 +48,19 @@ class QuickAccess(QWidget):
         self.button_layout.addWidget(self.hide_button)
 
     def on_info_click(self):
-        if not self.info.isVisible():
-            self.info.show()
-        else:
+        if self.info is not None:
             self.info.close()
+            return
+
+        # Imported on first use, same as the panel itself
+        from podap.view.info_panel import InfoPanel
+
+        self.info = InfoPanel(self.model, self.clock)
+        self.info.closed.connect(self.on_info_closed)
+        self.info.show()
+
+    def on_info_closed(self):
+        self.info = None
 
     def setup_hide_button(self, is_hidden: bool):
         self.hidden = is_hidden
@@ -60,5 +71,6 @@ class QuickAccess(QWidget):
         self.collape_tasks.emit(self.hidden)
 
     def on_exit_click(self):
-        self.info.close()
+        if self.info is not None:
+            self.info.close()
         self.should_close.emit()
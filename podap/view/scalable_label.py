@@ -1,12 +1,27 @@
-from PySide6.QtGui import QResizeEvent, Qt, QPaintEvent, QFontMetricsF
+from functools import lru_cache
+
+from typing import Dict, Optional, Tuple
+
+from PySide6.QtCore import QPointF, QRect
+from PySide6.QtGui import QResizeEvent, Qt, QPaintEvent, QFontMetricsF, QFont, QPainter, QPixmap, QStaticText, \
+    QTextOption, QTransform
 from PySide6.QtWidgets import QLabel
 
+from podap.stats import Stats
+
 
 class ScalableLabel(QLabel):
-    """ Label that changes its font size to accupy as much space as possible without overflowing """
+    """
+    Label that changes its font size to accupy as much space as possible without overflowing.
+
+    The text is laid out and rendered into a pixmap once for the chosen font and size, and the pixmap is reused by all
+    the following repaints (e.g.: blinking or moving the window) until either the text, the font, the size or the text
+    color changes. Rich text is painted by the QLabel itself, without any caching.
+    """
 
     FONT_PRECISION = 0.5
     SCALING_FACTOR = 0.96  # Don't occupy all the available space so that window can still be resized
+    FONT_CACHE_SIZE = 256
 
     def __init__(self, text, *args, **kwargs):
         super().__init__(text=text, *args, **kwargs)
@@ -18,6 +33,14 @@ class ScalableLabel(QLabel):
         self.italic = False
         self.starting_size = 10
 
+        # Laid out text and its position, along with the text, font, size and alignment it was laid out for
+        self.static_text = None  # type: Optional[QStaticText]
+        self.text_position = QPointF()
+        self.layout_key = None  # type: Optional[Tuple]
+
+        # The laid out text rendered in each of the colors it was painted with, keyed by the color
+        self.text_pixmaps = {}  # type: Dict[int, QPixmap]
+
     def set_starting_font_size(self, size: int):
         self.starting_size = size
         self.should_redraw = True
@@ -35,6 +58,10 @@ class ScalableLabel(QLabel):
         self.should_redraw = True
 
     def paintEvent(self, event: QPaintEvent) -> None:
+        with Stats.INSTANCE.timer('label.paint_ms'):
+            self._paint(event)
+
+    def _paint(self, event: QPaintEvent):
         if self.should_redraw:
             new_font = self.font()
             font_size = self.get_maximum_font_size()
@@ -44,22 +71,121 @@ class ScalableLabel(QLabel):
             self.setFont(new_font)
             self.should_redraw = False
 
-        QLabel.paintEvent(self, event)
+        if self._is_rich_text():
+            super().paintEvent(event)
+            return
+
+        painter = QPainter(self)
+        self.drawFrame(painter)
+        painter.drawPixmap(self.contentsRect().topLeft(), self._get_text_pixmap())
+
+    def _is_rich_text(self) -> bool:
+        """ Same check as the one QLabel makes for its own text (e.g.: for the titles with markup in them) """
+        text_format = self.textFormat()
+        return text_format == Qt.RichText or (text_format == Qt.AutoText and Qt.mightBeRichText(self.text()))
+
+    def _get_text_pixmap(self) -> QPixmap:
+        """
+        Text rendered with the current color. Large fonts are not covered by the glyph cache of Qt, so even a laid out
+        text is expensive to draw, but blitting a pixmap is not.
+        """
+        static_text = self._get_static_text()
+        color = self.palette().color(self.foregroundRole())
+        pixmap = self.text_pixmaps.get(color.rgba())
+        if pixmap is not None:
+            return pixmap
+
+        Stats.INSTANCE.count('label.text_renders')
+        rect = self.contentsRect()
+        ratio = self.devicePixelRatioF()
+        pixmap = QPixmap(max(round(rect.width() * ratio), 1), max(round(rect.height() * ratio), 1))
+        pixmap.setDevicePixelRatio(ratio)
+        pixmap.fill(Qt.transparent)
+
+        painter = QPainter(pixmap)
+        painter.setFont(self.font())
+        painter.setPen(color)
+        painter.drawStaticText(self.text_position - QPointF(rect.topLeft()), static_text)
+        painter.end()
+
+        # Only ever a couple of colors (e.g.: blinking), and they are dropped along with the layout
+        self.text_pixmaps[color.rgba()] = pixmap
+        return pixmap
+
+    def _get_static_text(self) -> QStaticText:
+        """ Text laid out for the current font and size, reused for as long as those stay the same """
+        rect = self.contentsRect()
+        font = self.font()
+        alignment = self.alignment()
+        key = (self.text(), font.key(), rect.x(), rect.y(), rect.width(), rect.height(), int(alignment),
+               self.wordWrap(), self.devicePixelRatioF())
+        if key == self.layout_key:
+            return self.static_text
+
+        Stats.INSTANCE.count('label.layouts')
+
+        # The horizontal alignment is applied by the layout itself, within the whole width of the label
+        option = QTextOption(alignment & Qt.AlignHorizontal_Mask)
+        option.setWrapMode(QTextOption.WordWrap if self.wordWrap() else QTextOption.NoWrap)
+
+        static_text = QStaticText(self.text())
+        static_text.setTextFormat(Qt.PlainText)
+        static_text.setTextOption(option)
+        static_text.setTextWidth(rect.width())
+        static_text.prepare(QTransform(), font)
+
+        height = static_text.size().height()
+        if alignment & Qt.AlignTop:
+            y = rect.y()
+        elif alignment & Qt.AlignBottom:
+            y = rect.y() + rect.height() - height
+        else:
+            y = rect.y() + (rect.height() - height) / 2.0
+
+        self.static_text = static_text
+        self.text_position = QPointF(rect.x(), y)
+        self.text_pixmaps.clear()
+        self.layout_key = key
+        return static_text
 
     def get_maximum_font_size(self):
-        text = self.text()
-
         widget_rect = self.contentsRect()
-        widget_width = widget_rect.width() * self.SCALING_FACTOR
-        widget_height = widget_rect.height() * self.SCALING_FACTOR
-
-        font = self.font()
-        current_size = self.starting_size
+        flags = int((Qt.TextWordWrap if self.wordWrap() else 0) | self.alignment())
+
+        # The font as it is going to be painted, all but the size, which is the one being fitted
+        font = QFont(self.font())
+        font.setBold(self.bold)
+        font.setItalic(self.italic)
+        font.setPointSizeF(self.starting_size)
+
+        fit = ScalableLabel._fit_font_size
+        misses = fit.cache_info().misses if Stats.INSTANCE.enabled else 0
+        size = fit(self.text(), widget_rect.width(), widget_rect.height(), font.key(), flags,
+                   self.devicePixelRatioF(), self.starting_size)
+
+        if Stats.INSTANCE.enabled:
+            hit = fit.cache_info().misses == misses
+            Stats.INSTANCE.count('label.font_cache_hits' if hit else 'label.font_cache_misses')
+        return size
+
+    @staticmethod
+    @lru_cache(maxsize=FONT_CACHE_SIZE)
+    def _fit_font_size(text: str, width: int, height: int, font_key: str, flags: int, device_pixel_ratio: float,
+                       starting_size: float) -> float:
+        # Note: the device pixel ratio is not used directly, but a different screen may result in different metrics
+        widget_rect = QRect(0, 0, width, height)
+        widget_width = width * ScalableLabel.SCALING_FACTOR
+        widget_height = height * ScalableLabel.SCALING_FACTOR
+
+        # The key is a complete description of the font (family, weight, style, stretch, spacing, ...)
+        font = QFont()
+        font.fromString(font_key)
+        current_size = starting_size
 
         step = current_size / 2.0
 
-        if step <= self.FONT_PRECISION:
-            step = self.FONT_PRECISION * 4.0
+        if step <= ScalableLabel.FONT_PRECISION:
+            step = ScalableLabel.FONT_PRECISION * 4.0
 
         last_tested_size = current_size
 
@@ -70,14 +196,15 @@ class ScalableLabel(QLabel):
             return current_size
 
         #  Only stop when step is small enough and new size is smaller than QWidget
-        while step > self.FONT_PRECISION or current_height > widget_height or current_width > widget_width:
+        iterations = 0
+        while step > ScalableLabel.FONT_PRECISION or current_height > widget_height or current_width > widget_width:
+            iterations += 1
             last_tested_size = current_size
 
             font.setPointSizeF(current_size)
             fm = QFontMetricsF(font)
 
-            new_font_size_rect = fm.boundingRect(widget_rect,
-                                                 (Qt.TextWordWrap if self.wordWrap() else 0) | self.alignment(), text)
+            new_font_size_rect = fm.boundingRect(widget_rect, flags, text)
 
             current_height = new_font_size_rect.height()
             current_width = new_font_size_rect.width()
@@ -85,7 +212,7 @@ class ScalableLabel(QLabel):
             # If new font size is too big, decrease it
             if (current_height > widget_height) or (current_width > widget_width):
                 current_size -= step
-                if step > self.FONT_PRECISION:
+                if step > ScalableLabel.FONT_PRECISION:
                     step /= 2.0
 
                 if current_size <= 0:
@@ -93,6 +220,7 @@ class ScalableLabel(QLabel):
             else:
                 current_size += step
 
+        Stats.INSTANCE.observe('label.fit_iterations', iterations)
         return last_tested_size
 
     """
@@ -1,74 +1,169 @@
 from datetime import datetime
+from typing import Optional
 
-from PySide6.QtCore import Signal, QTimer
-from PySide6.QtWidgets import QWidget, QVBoxLayout
+from PySide6.QtCore import Qt
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel
 
-from podap.model import Model, DayOfWeek
+from podap.config import Config
+from podap.model import Model, ModelChange
 from podap.view import ErrorMessage, CurrentTask
+from podap.view.clock import Clock
 from podap.view.scalable_label import ScalableLabel
+from podap.view.styles import SMALL_LABEL_STYLE
+from podap.view.view_state import TasksViewState
 
 
 class TasksView(QWidget):
-    model_changed = Signal()
-    model_error = Signal(str)
 
-    def __init__(self, model: Model, *args, **kwargs):
+    def __init__(self, model: Model, clock: Clock, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
         self.model = model
+        self.clock = clock
+        self.clock_mode = Config.INSTANCE.clock_mode
+        self.show_clock = self.clock_mode != Config.CLOCK_NONE
+
+        # Last state applied to the widgets, and the inputs for the next one
+        self.state = None  # type: Optional[TasksViewState]
+        self.current_title = '???'
+        self.next_title = '???'
+        self.error = None  # type: Optional[str]
+
+        # Error of the last task lookup, cleared by the next successful one (e.g.: once the schedule is fixed)
+        self.task_error = None  # type: Optional[str]
+
+        # Nothing is updated while inactive (e.g.: collapsed or minimized), see set_active
+        self.active = True
 
         self.layout = QVBoxLayout(self)
         self.layout.setContentsMargins(0, 0, 0, 0)
 
         self.error_message = ErrorMessage('Oh no, an error!')
+        self.error_message.clicked.connect(self.on_error_dismissed)
         self.layout.addWidget(self.error_message)
 
-        self.current_task = CurrentTask('???')
+        self.current_task = CurrentTask('???', self.clock)
         self.current_task.set_bold(True)
         self.layout.addWidget(self.current_task)
 
         self.next_task = ScalableLabel('???')
-        self.layout.addWidget(self.next_task)
 
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.update_tasks)
-        self.timer.start(500)
+        # A separate clock element with a fixed size, so that ticking doesn't invalidate the font fit of the tasks
+        self.clock_label = None  # type: Optional[QLabel]
+        if self.clock_mode == Config.CLOCK_SEPARATE:
+            next_layout = QHBoxLayout()
+            next_layout.setContentsMargins(0, 0, 0, 0)
+            next_layout.addWidget(self.next_task)
+
+            self.clock_label = QLabel('00:00:00')
+            self.clock_label.setStyleSheet(SMALL_LABEL_STYLE)
+            self.clock_label.setAlignment(Qt.AlignCenter)
+            self.clock_label.ensurePolished()
+            self.clock_label.setFixedSize(self.clock_label.sizeHint())
+            next_layout.addWidget(self.clock_label)
+
+            self.layout.addLayout(next_layout)
+        else:
+            self.layout.addWidget(self.next_task)
+
+        self.clock.transition.connect(self.update_tasks)
+        self.clock.tick.connect(self.update_clock)
+        self.clock.request_ticks(self, self.show_clock)
 
         self.model.subscribe_to_changes(self.on_model_change)
         self.model.subscribe_to_errors(self.on_model_error)
 
-        self.model_error.connect(self.show_model_error)
-        self.model_changed.connect(self.update_changed_model)
-
-        # Immediately update UI this way we won't see ??? before the first timer tick
+        # Immediately update UI this way we won't see ??? before the first transition
         self.update_tasks()
 
+    def set_active(self, active: bool):
+        """ Stop or resume the clock and the updates, resyncing with the model and the time on resume """
+        if active == self.active:
+            return
+
+        self.active = active
+        self.clock.request_ticks(self, active and self.show_clock)
+        self.current_task.set_active(active)
+        if active:
+            self.update_tasks()
+
     def show_model_error(self, message: str):
-        self.error_message.show_error(message)
+        self.error = message
+        self.update_clock()
 
-    def update_changed_model(self):
-        self.update_tasks()
+    def on_error_dismissed(self):
+        # Make sure the same error is shown again, should it occur again
+        self.error = None
+        self.task_error = None
+        if self.state is not None:
+            self.state = self.state._replace(error=None)
 
     def on_model_error(self, _, message):
-        # May be called from watcher thread
-        self.model_error.emit(message)
+        self.show_model_error(message)
 
-    def on_model_change(self, _):
-        # May be called from watcher thread
-        self.model_changed.emit()
+    def on_model_change(self, _, __: ModelChange):
+        # The pending task may come from any of the following days (e.g.: after the last break of the day), so there
+        # is no telling which changes it depends on
+        self.update_tasks()
 
     def update_tasks(self):
-        try:
-            current_entry = self.model.get_current_task()
-            next_entry = self.model.get_pending_task()
+        """ Re-query the model (e.g.: on transitions and model changes) and apply the resulting state """
+        if not self.active:
+            # Going to be updated on resume
+            return
+
+        if not self.model.loaded:
+            # The first reload is still running, its change notification will bring us back here
+            self.current_title = 'Loading...'
+            self.next_title = ''
+            self.update_clock()
+            return
 
-            date = datetime.now()
-            # day_number = DayOfWeek.from_date_time(date).value[0]
-
-            self.current_task.setText(current_entry.title)
-
-            task = f'Next: {next_entry.title}'
-            time = f'{date.hour:02}:{date.minute:02}:{date.second:02}'
-            self.next_task.setText(f'{task} {time}')
+        try:
+            # Use a single snapshot, so that both tasks are consistent with each other
+            schedule = self.model.schedule
+            now = datetime.now()
+            self.current_title = schedule.get_current_task(now).title
+            self.next_title = f'Next: {schedule.get_pending_task(now).title}'
+            self.task_error = None
         except ValueError as e:
-            self.model_error.emit(str(e))
+            # Don't keep showing the task that is no longer known to be current
+            self.current_title = '???'
+            self.next_title = ''
+            self.task_error = str(e)
+
+        self.update_clock()
+
+    def update_clock(self):
+        """ Apply the state with the current time, reusing the already known titles """
+        if not self.active:
+            return
+
+        self.apply_state(self.build_state(datetime.now()))
+
+    def build_state(self, date: datetime) -> TasksViewState:
+        clock = f'{date.hour:02}:{date.minute:02}:{date.second:02}' if self.show_clock else ''
+        return TasksViewState(current_title=self.current_title, next_title=self.next_title, clock=clock,
+                              error=self.error if self.error is not None else self.task_error)
+
+    def apply_state(self, state: TasksViewState):
+        """ Only touch the widgets displaying the fields that actually changed """
+        changed = state.changed_fields(self.state)
+        self.state = state
+
+        if 'current_title' in changed:
+            self.current_task.setText(state.current_title)
+
+        if self.clock_label is not None:
+            if 'next_title' in changed:
+                self.next_task.setText(state.next_title)
+            if 'clock' in changed:
+                self.clock_label.setText(state.clock)
+        elif 'next_title' in changed or 'clock' in changed:
+            self.next_task.setText(f'{state.next_title} {state.clock}' if self.show_clock else state.next_title)
+
+        if 'error' in changed:
+            if state.error is not None:
+                self.error_message.show_error(state.error)
+            else:
+                self.error_message.hide_error()
@@ -0,0 +1,16 @@
+from typing import NamedTuple, Optional, Set
+
+
+class TasksViewState(NamedTuple):
+    """ Immutable snapshot of everything displayed by the tasks view """
+    current_title: str
+    next_title: str
+    clock: str
+    error: Optional[str]
+
+    def changed_fields(self, other: Optional['TasksViewState']) -> Set[str]:
+        """ Names of the fields that differ from the other state (all of them if there is no other state) """
+        if other is None:
+            return set(self._fields)
+
+        return {x for x, a, b in zip(self._fields, self, other) if a != b}
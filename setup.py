@@ -26,7 +26,7 @@ setup(
     author='Dennis Sitelew',
     author_email='yowidin@gmail.com',
     license='MIT',
-    packages=find_packages(exclude=('test',)),
+    packages=find_packages(exclude=('test', 'benchmark')),
     scripts=[
         'bin/podap',
     ],
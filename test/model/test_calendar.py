@@ -0,0 +1,67 @@
+import unittest
+from datetime import date
+
+from podap.model import Calendar, DatedDay, DayEntry, DayOfWeek, HourEntry
+
+
+def make_day(title: str) -> DayEntry:
+    return DayEntry(DayOfWeek.Monday, [HourEntry(start_hour=0, title=title, duration_minutes=24 * 60)])
+
+
+class CalendarTestCase(unittest.TestCase):
+    def test_empty(self):
+        calendar = Calendar()
+        self.assertTrue(calendar.is_empty())
+        self.assertIsNone(calendar.get_day(date(2024, 1, 1)))
+
+    def test_dated_days(self):
+        holidays = make_day('holidays')
+        eve = make_day('eve')
+        calendar = Calendar([DatedDay(date(2024, 12, 20), date(2024, 12, 31), holidays),
+                             DatedDay(date(2024, 12, 24), date(2024, 12, 24), eve)])
+
+        self.assertIsNone(calendar.get_day(date(2024, 12, 19)))
+        self.assertIs(calendar.get_day(date(2024, 12, 20)), holidays)
+        self.assertIs(calendar.get_day(date(2024, 12, 23)), holidays)
+
+        # The narrower range wins
+        self.assertIs(calendar.get_day(date(2024, 12, 24)), eve)
+        self.assertEqual(calendar.get_day(date(2024, 12, 24)).timeline.get(13 * 60).title, 'eve')
+
+        self.assertIs(calendar.get_day(date(2024, 12, 25)), holidays)
+        self.assertIs(calendar.get_day(date(2024, 12, 31)), holidays)
+        self.assertIsNone(calendar.get_day(date(2025, 1, 1)))
+
+        # Adjacent pieces of the same range are merged back together
+        self.assertEqual(len(calendar.starts), 3)
+
+    def test_same_range_later_start_wins(self):
+        first = make_day('first')
+        second = make_day('second')
+        calendar = Calendar([DatedDay(date(2024, 1, 1), date(2024, 1, 3), first),
+                             DatedDay(date(2024, 1, 2), date(2024, 1, 4), second)])
+
+        self.assertIs(calendar.get_day(date(2024, 1, 1)), first)
+        self.assertIs(calendar.get_day(date(2024, 1, 2)), second)
+        self.assertIs(calendar.get_day(date(2024, 1, 4)), second)
+
+    def test_rotation(self):
+        on_call = make_day('on call')
+        calendar = Calendar(rotation={(1, DayOfWeek.Monday): on_call}, anchor=date(2024, 1, 3))
+
+        self.assertEqual(calendar.period, 2)
+        self.assertIsNone(calendar.get_day(date(2024, 1, 1)))
+        self.assertIs(calendar.get_day(date(2024, 1, 8)), on_call)
+        self.assertIsNone(calendar.get_day(date(2024, 1, 9)))
+        self.assertIsNone(calendar.get_day(date(2024, 1, 15)))
+        self.assertIs(calendar.get_day(date(2024, 1, 22)), on_call)
+
+        # Dated days take precedence over the rotation
+        holiday = make_day('holiday')
+        calendar = Calendar([DatedDay(date(2024, 1, 8), date(2024, 1, 8), holiday)],
+                            rotation={(1, DayOfWeek.Monday): on_call}, anchor=date(2024, 1, 3))
+        self.assertIs(calendar.get_day(date(2024, 1, 8)), holiday)
+
+
+if __name__ == '__main__':
+    unittest.main()
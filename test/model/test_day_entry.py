@@ -23,6 +23,13 @@ class DayEntryTestCase(unittest.TestCase):
         self.assertEqual(entry.entries[1].start_hour, 8)
         self.assertEqual(entry.entries[1].title, 'bar')
 
+    def test_content_hash(self):
+        entry = DayEntry.parse(DayOfWeek.Tuesday, 'foo\n7:00\n\nbar\n8:00')
+        same = DayEntry.parse(DayOfWeek.Tuesday, '\r\nfoo\r\n07:00\r\n\r\n\r\nbar\r\n8:00\r\n')
+        different = DayEntry.parse(DayOfWeek.Tuesday, 'foo\n7:00\n\nbar\n8:30')
+        self.assertEqual(entry.content_hash, same.content_hash)
+        self.assertNotEqual(entry.content_hash, different.content_hash)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -17,10 +17,29 @@ class HourEntryTest(unittest.TestCase):
         with self.assertRaises(ValueError):
             HourEntry.parse('foo\nbar:00')
 
+        with self.assertRaises(ValueError):
+            HourEntry.parse('foo\n7:00\n\nbar\n8:00')
+
         entry = HourEntry.parse('foo\n7:00')
         self.assertEqual(entry.start_hour, 7)
         self.assertEqual(entry.title, 'foo')
 
+        entry = HourEntry.parse('foo\n7:30')
+        self.assertEqual(entry.start_minute, 30)
+        self.assertEqual(str(entry), 'foo\n07:30')
+
+    def test_time_range(self):
+        entry = HourEntry.parse('foo\n7:30-9:15')
+        self.assertEqual((entry.start, entry.end, entry.duration_minutes), (450, 555, 105))
+        self.assertEqual(str(entry), 'foo\n07:30-09:15')
+        self.assertTrue(entry.is_active(9, 14))
+        self.assertFalse(entry.is_active(9, 15))
+
+        self.assertEqual(HourEntry.parse('foo\n23:00-24:00').end, 24 * 60)
+
+        with self.assertRaises(ValueError):
+            HourEntry.parse('foo\n9:00-8:00')
+
 
 if __name__ == '__main__':
     unittest.main()
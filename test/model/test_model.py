@@ -0,0 +1,266 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from datetime import date, datetime, timedelta
+
+from podap.config import Config
+from podap.model import Model, DayOfWeek
+
+EXAMPLE_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'example')
+
+
+class ModelTestCase(unittest.TestCase):
+    def setUp(self):
+        self.working_directory = tempfile.mkdtemp()
+        for name in os.listdir(EXAMPLE_DIR):
+            shutil.copy(os.path.join(EXAMPLE_DIR, name), self.working_directory)
+
+        Config.INSTANCE = Config(working_directory=self.working_directory, pause_duration=15, pause_text='PAUSE',
+                                 borderless=False)
+
+    def tearDown(self):
+        shutil.rmtree(self.working_directory)
+        Config.INSTANCE = None
+
+    def write_day(self, name: str, text: str):
+        with open(os.path.join(self.working_directory, name), 'w') as f:
+            f.write(text)
+
+    def test_lookup(self):
+        model = Model()
+        self.assertEqual(model.get_for_day_and_time(DayOfWeek.Monday, 9, 0).title, 'Work')
+        self.assertEqual(model.get_for_day_and_time(DayOfWeek.Monday, 21, 10).title, 'Read books')
+        self.assertEqual(model.get_for_day_and_time(DayOfWeek.Monday, 21, 45).title, 'PAUSE')
+        self.assertEqual(model.get_for_date(datetime(2022, 6, 6, 22, 30)).title, 'Wind down')
+
+    def test_first_entry_wins(self):
+        self.write_day('0_mo.txt', 'foo\n0:00\n\nbar\n0:00')
+        model = Model()
+        self.assertEqual(model.get_for_day_and_time(DayOfWeek.Monday, 0, 0).title, 'foo')
+
+    def test_missing_entry(self):
+        self.write_day('0_mo.txt', 'foo\n0:00')
+        model = Model()
+        with self.assertRaises(ValueError):
+            model.get_for_day_and_time(DayOfWeek.Monday, 1, 0)
+
+    def test_reload_rebuilds_index(self):
+        model = Model()
+        self.write_day('0_mo.txt', 'foo\n0:00')
+        model.reload()
+        self.assertEqual(model.get_for_day_and_time(DayOfWeek.Monday, 0, 0).title, 'foo')
+        self.assertIsNone(model.days[DayOfWeek.Monday].timeline.get(60))
+
+    def test_timelines_are_compiled_on_reload(self):
+        model = Model()
+        # Readers on other threads should never have to build (i.e.: modify) anything
+        for day in model.days.values():
+            self.assertIsNotNone(day._timeline)
+
+    def test_incremental_reload(self):
+        model = Model()
+        events = []
+        model.subscribe_to_changes(lambda _, change: events.append(change))
+
+        days = dict(model.days)
+        model.reload()
+        self.assertEqual(events, [])
+
+        # Same content with a new modification time: nothing is reparsed and no event is issued
+        path = os.path.join(self.working_directory, '1_tu.txt')
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000))
+        model.reload()
+        self.assertEqual(events, [])
+        self.assertIs(model.days[DayOfWeek.Tuesday], days[DayOfWeek.Tuesday])
+
+        # Only the changed file is reparsed
+        self.write_day('0_mo.txt', 'foo\n0:00')
+        model.reload()
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0].modified, (DayOfWeek.Monday,))
+        self.assertIsNot(model.days[DayOfWeek.Monday], days[DayOfWeek.Monday])
+        for day in DayOfWeek:
+            if day != DayOfWeek.Monday:
+                self.assertIs(model.days[day], days[day])
+
+    def test_removed_file(self):
+        model = Model()
+        os.remove(os.path.join(self.working_directory, '6_su.txt'))
+        model.reload()
+        self.assertNotIn(DayOfWeek.Sunday, model.days)
+        with self.assertRaises(ValueError):
+            model.get_for_date(datetime(2022, 6, 12, 0, 0))
+
+    def test_unreadable_entries(self):
+        model = Model()
+
+        # Matches the file pattern, but can't be read
+        os.remove(os.path.join(self.working_directory, '6_su.txt'))
+        os.mkdir(os.path.join(self.working_directory, '6_su.txt'))
+        model.reload()
+        self.assertNotIn(DayOfWeek.Sunday, model.days)
+
+        shutil.rmtree(self.working_directory)
+        with self.assertRaisesRegex(ValueError, 'Could not read the working directory'):
+            model.reload()
+        os.mkdir(self.working_directory)
+
+    def test_next_transition(self):
+        model = Model()
+        self.assertEqual(model.get_next_transition(datetime(2022, 6, 6, 9, 10, 30)), datetime(2022, 6, 6, 9, 45))
+        self.assertEqual(model.get_next_transition(datetime(2022, 6, 6, 9, 45)), datetime(2022, 6, 6, 10, 0))
+        self.assertEqual(model.get_next_transition(datetime(2022, 6, 12, 23, 50)), datetime(2022, 6, 13, 0, 0))
+
+        Config.INSTANCE = Config(working_directory=self.working_directory, pause_duration=0, pause_text='PAUSE',
+                                 borderless=False)
+        model = Model()
+        self.assertEqual(model.get_next_transition(datetime(2022, 6, 6, 9, 10)), datetime(2022, 6, 6, 10, 0))
+
+    def test_minute_entries(self):
+        self.write_day('0_mo.txt', 'Sleep\n0:00-8:30\n\nStandup\n8:30-8:45\n\nWork\n8:45-24:00')
+        model = Model()
+        self.assertEqual(model.get_for_date(datetime(2022, 6, 6, 8, 29)).title, 'Sleep')
+        self.assertEqual(model.get_for_date(datetime(2022, 6, 6, 8, 30)).title, 'Standup')
+
+        # The break at the end of the hour takes precedence
+        self.assertEqual(model.get_for_date(datetime(2022, 6, 6, 8, 45)).title, 'PAUSE')
+        self.assertEqual(model.schedule.get_pending_task(datetime(2022, 6, 6, 8, 35)).title, 'Work')
+        self.assertEqual(model.get_next_transition(datetime(2022, 6, 6, 8, 20)), datetime(2022, 6, 6, 8, 30))
+        self.assertEqual(model.schedule.get_time_remaining(datetime(2022, 6, 6, 8, 40, 30)), timedelta(seconds=270))
+
+    def test_pomodoro_cycles(self):
+        Config.INSTANCE = Config(working_directory=self.working_directory, pause_duration=5, pause_text='PAUSE',
+                                 borderless=False, work_duration=25, long_break_duration=15, long_break_every=4)
+        model = Model()
+        monday = datetime(2022, 6, 6)
+        self.assertEqual(model.get_for_date(monday.replace(hour=0, minute=24)).title, 'Sleep')
+        self.assertEqual(model.get_for_date(monday.replace(hour=0, minute=25)).title, 'PAUSE')
+        self.assertEqual(model.get_for_date(monday.replace(hour=0, minute=30)).title, 'Sleep')
+
+        # The first long break of the day ends the fourth cycle, at 1:55
+        self.assertEqual(model.get_for_date(monday.replace(hour=1, minute=55)).title, 'PAUSE')
+        self.assertEqual(model.get_for_date(monday.replace(hour=2, minute=5)).title, 'PAUSE')
+        self.assertEqual(model.get_next_transition(monday.replace(hour=2, minute=5)), monday.replace(hour=2, minute=10))
+        self.assertEqual(model.get_for_date(monday.replace(hour=2, minute=10)).title, 'Sleep')
+
+        # Pending task is the one after the break, even across midnight
+        self.assertEqual(model.schedule.get_pending_task(datetime(2022, 6, 12, 23, 59)).title, 'Sleep')
+
+    def test_change_diff(self):
+        model = Model()
+        events = []
+        model.subscribe_to_changes(lambda _, change: events.append(change))
+
+        # Formatting changes do not change the contents
+        path = os.path.join(self.working_directory, '2_we.txt')
+        with open(path, 'r') as f:
+            text = f.read()
+        self.write_day('2_we.txt', '\n\n' + text.replace('\n\n', '\n\n\n') + '\n')
+        model.reload()
+        self.assertEqual(events, [])
+
+        # Change the third entry on Wednesday, and remove Sunday
+        self.write_day('2_we.txt', text.replace('Sleep\n2:00', 'Dream\n2:00'))
+        os.remove(os.path.join(self.working_directory, '6_su.txt'))
+        model.reload()
+
+        self.assertEqual(len(events), 1)
+        change = events[0]
+        self.assertEqual(change.modified, (DayOfWeek.Wednesday,))
+        self.assertEqual(change.removed, (DayOfWeek.Sunday,))
+        self.assertEqual(change.added, ())
+        self.assertEqual(change.days[DayOfWeek.Wednesday].changed_entries, (2,))
+        self.assertTrue(change.affects(DayOfWeek.Sunday))
+        self.assertFalse(change.affects(DayOfWeek.Monday))
+
+    def test_snapshots_and_dispatcher(self):
+        posted = []
+        model = Model(dispatcher=posted.append)
+        posted.clear()
+        events = []
+        model.subscribe_to_changes(lambda _, change: events.append(change))
+        errors = []
+        model.subscribe_to_errors(lambda _, message: errors.append(message))
+
+        snapshot = model.schedule
+        self.write_day('0_mo.txt', 'foo\n0:00')
+        thread = threading.Thread(target=model.changed_from_outside)
+        thread.start()
+        thread.join()
+
+        # The new snapshot is swapped in, but the old one stays intact for whoever is still holding it
+        self.assertIsNot(model.schedule, snapshot)
+        self.assertEqual(snapshot.get_for_day_and_time(DayOfWeek.Monday, 0, 0).title, 'Sleep')
+        self.assertEqual(model.get_for_day_and_time(DayOfWeek.Monday, 0, 0).title, 'foo')
+
+        # Notifications are only delivered through the dispatcher
+        self.assertEqual(events, [])
+        self.assertEqual(len(posted), 1)
+        posted.pop()()
+        self.assertEqual(len(events), 1)
+
+        self.write_day('0_mo.txt', 'foo')
+        model.changed_from_outside()
+        self.assertEqual(errors, [])
+        posted.pop()()
+        self.assertEqual(len(errors), 1)
+
+    def test_background_load(self):
+        posted = []
+        model = Model(dispatcher=posted.append, load=False)
+        self.assertFalse(model.loaded)
+        self.assertEqual(posted, [])
+
+        done = threading.Event()
+        model.reload_worker.reload = lambda: (model.changed_from_outside(), done.set())
+        model.request_reload()
+        self.assertTrue(done.wait(5))
+
+        self.assertTrue(model.loaded)
+        self.assertEqual(model.get_for_day_and_time(DayOfWeek.Monday, 9, 0).title, 'Work')
+        self.assertEqual(len(posted), 1)
+
+    def test_calendar(self):
+        self.write_day('2024-12-24_eve.txt', 'Celebrate\n0:00\n\nCelebrate\n1:00')
+        self.write_day('2024-12-27..2024-12-31_holidays.txt', 'Relax\n0:00\n\nRelax\n1:00')
+        self.write_day('w1-0_mo.txt', 'On call\n0:00\n\nOn call\n1:00')
+        Config.INSTANCE.rotation_anchor = date(2024, 12, 2)
+        model = Model()
+
+        # Tuesday, Friday and Monday of the rotation week 1
+        self.assertEqual(model.get_for_date(datetime(2024, 12, 24, 1, 5)).title, 'Celebrate')
+        self.assertEqual(model.get_for_date(datetime(2024, 12, 27, 0, 5)).title, 'Relax')
+        self.assertEqual(model.get_for_date(datetime(2024, 12, 9, 0, 5)).title, 'On call')
+        self.assertEqual(model.get_for_date(datetime(2024, 12, 24, 1, 50)).title, 'PAUSE')
+
+        # Weeks outside of the rotation and days without any dated entries use the weekly schedule
+        self.assertEqual(model.get_for_date(datetime(2024, 12, 2, 0, 5)).title, 'Sleep')
+        self.assertEqual(model.get_for_date(datetime(2024, 12, 16, 0, 5)).title, 'Sleep')
+
+        # Dated days don't have to cover the whole day
+        with self.assertRaises(ValueError):
+            model.get_for_date(datetime(2024, 12, 24, 9, 5))
+
+        self.assertEqual(model.schedule.get_current_day(datetime(2024, 12, 28)).path,
+                         os.path.join(self.working_directory, '2024-12-27..2024-12-31_holidays.txt'))
+        self.assertEqual(model.schedule.get_pending_task(datetime(2024, 12, 23, 23, 30)).title, 'Celebrate')
+
+        events = []
+        model.subscribe_to_changes(lambda _, change: events.append(change))
+        os.remove(os.path.join(self.working_directory, '2024-12-24_eve.txt'))
+        model.reload()
+        self.assertEqual(len(events), 1)
+        self.assertTrue(events[0].calendar_changed)
+        self.assertTrue(events[0].affects(DayOfWeek.Monday))
+
+    def test_bad_calendar_file_name(self):
+        self.write_day('2024-12-31..2024-12-24_holidays.txt', 'Relax\n0:00')
+        with self.assertRaises(ValueError):
+            Model()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from podap.config import Config
+from podap.model import Model, ParseCache, DayOfWeek
+
+EXAMPLE_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'example')
+
+
+class ParseCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.working_directory = tempfile.mkdtemp()
+        for name in os.listdir(EXAMPLE_DIR):
+            shutil.copy(os.path.join(EXAMPLE_DIR, name), self.working_directory)
+
+        self.cache_directory = tempfile.mkdtemp()
+        self.cache_path = os.path.join(self.cache_directory, 'cache.bin')
+
+        Config.INSTANCE = Config(working_directory=self.working_directory, pause_duration=15, pause_text='PAUSE',
+                                 borderless=False)
+
+    def tearDown(self):
+        shutil.rmtree(self.working_directory)
+        shutil.rmtree(self.cache_directory)
+        Config.INSTANCE = None
+
+    def test_warm_start(self):
+        Model(cache=ParseCache(self.cache_path))
+        self.assertTrue(os.path.exists(self.cache_path))
+
+        changed = os.path.join(self.working_directory, '0_mo.txt')
+        with open(changed, 'w') as f:
+            f.write('foo\n0:00')
+
+        model = Model(cache=ParseCache(self.cache_path))
+        self.assertEqual(model.get_for_day_and_time(DayOfWeek.Monday, 0, 0).title, 'foo')
+        self.assertEqual(model.get_for_day_and_time(DayOfWeek.Tuesday, 9, 0).title, 'Work')
+
+        # Only the changed file had to be read
+        read = [path for path, x in model.files.items() if x.text is not None]
+        self.assertEqual(read, [changed])
+
+    def test_unchanged_cache_is_not_rewritten(self):
+        Model(cache=ParseCache(self.cache_path))
+        os.utime(self.cache_path, ns=(0, 0))
+
+        model = Model(cache=ParseCache(self.cache_path))
+        model.reload()
+        self.assertEqual(os.stat(self.cache_path).st_mtime_ns, 0)
+
+    def test_invalid_cache(self):
+        with open(self.cache_path, 'wb') as f:
+            f.write(b'garbage')
+
+        model = Model(cache=ParseCache(self.cache_path))
+        self.assertEqual(model.get_for_day_and_time(DayOfWeek.Monday, 9, 0).title, 'Work')
+
+        cache = ParseCache(self.cache_path)
+        cache.FORMAT_VERSION = ParseCache.FORMAT_VERSION + 1
+        self.assertEqual(cache.load(), {})
+
+        # Valid JSON, but not what the cache is made of
+        for data in ('[3, []]', '[3, {"0_mo.txt": 1}]', '[3, {"0_mo.txt": [[1, 2, 3], "zz", 0, []]}]', '{}'):
+            with open(self.cache_path, 'w') as f:
+                f.write(data.replace('3', str(ParseCache.FORMAT_VERSION), 1))
+            self.assertEqual(ParseCache(self.cache_path).load(), {}, data)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import threading
+import unittest
+
+from concurrent.futures import ThreadPoolExecutor
+
+from podap.model import ReloadWorker
+
+
+class ReloadWorkerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.executor = ThreadPoolExecutor(max_workers=2)
+
+    def tearDown(self):
+        self.executor.shutdown(wait=True)
+
+    def test_requests_are_coalesced(self):
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def reload():
+            calls.append(threading.current_thread().name)
+            if len(calls) == 1:
+                started.set()
+                release.wait(5)
+
+        worker = ReloadWorker(reload, executor=self.executor)
+        worker.request()
+        self.assertTrue(started.wait(5))
+
+        # All the requests made while the first reload is running end up in a single follow-up
+        for _ in range(10):
+            worker.request()
+        self.assertTrue(worker.is_busy())
+
+        release.set()
+        self.executor.shutdown(wait=True)
+        self.assertEqual(len(calls), 2)
+        self.assertFalse(worker.is_busy())
+
+    def test_survives_errors(self):
+        calls = []
+
+        def reload():
+            calls.append(None)
+            raise RuntimeError('boom')
+
+        worker = ReloadWorker(reload, executor=self.executor)
+        worker.request()
+        self.executor.shutdown(wait=True)
+        self.assertEqual(len(calls), 1)
+        self.assertFalse(worker.is_busy())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+
+from podap.model import DayTimeline, HourEntry
+
+
+class DayTimelineTestCase(unittest.TestCase):
+    def test_segments(self):
+        sleep = HourEntry(0, 'sleep', 8 * 60)
+        standup = HourEntry(9, 'standup', 15, 30)
+        work = HourEntry(9, 'work', 8 * 60)
+        timeline = DayTimeline([sleep, standup, work])
+
+        # The standup cuts the work in two, and nothing is scheduled between 8:00 and 9:00
+        self.assertEqual(timeline.starts, [0, 540, 570, 585])
+        self.assertEqual(timeline.ends, [480, 570, 585, 1020])
+        self.assertEqual(timeline.entries, [sleep, work, standup, work])
+
+        self.assertIs(timeline.get(479), sleep)
+        self.assertIsNone(timeline.get(480))
+        self.assertIs(timeline.get(575), standup)
+        self.assertIsNone(timeline.get(1020))
+
+        self.assertEqual(timeline.next_boundary(0), 480)
+        self.assertEqual(timeline.next_boundary(500), 540)
+        self.assertEqual(timeline.next_boundary(1100), 24 * 60)
+        self.assertEqual(timeline.next_end(500), 570)
+        self.assertIsNone(timeline.next_end(1020))
+
+    def test_first_entry_wins(self):
+        first = HourEntry(8, 'first', 30)
+        second = HourEntry(8, 'second', 60)
+        timeline = DayTimeline([first, second])
+        self.assertEqual(timeline.entries, [first, second])
+        self.assertEqual(timeline.starts, [480, 510])
+
+    def test_clipped_to_day(self):
+        timeline = DayTimeline([HourEntry(23, 'late', 120)])
+        self.assertEqual(timeline.ends, [24 * 60])
+
+    def test_hourly_cycles(self):
+        breaks = DayTimeline.cycles(45, 15)
+        self.assertEqual(len(breaks), 24)
+        self.assertEqual((breaks.starts[0], breaks.ends[0]), (45, 60))
+        self.assertEqual(breaks.ends[-1], 24 * 60)
+
+    def test_pomodoro_cycles(self):
+        breaks = DayTimeline.cycles(25, 5, 15, 4, 'pause')
+        self.assertEqual(breaks.starts[:5], [25, 55, 85, 115, 155])
+        self.assertEqual(breaks.ends[:5], [30, 60, 90, 130, 160])
+        self.assertEqual(breaks.get(120).title, 'pause')
+
+    def test_no_breaks(self):
+        self.assertEqual(len(DayTimeline.cycles(60, 0)), 0)
+
+        with self.assertRaises(ValueError):
+            DayTimeline.cycles(0, 0)
+
+        with self.assertRaises(ValueError):
+            DayTimeline.cycles(25, -5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+from podap.model.tokenizer import tokenize, tokenize_columns, ScheduleSyntaxError
+
+
+class TokenizerTestCase(unittest.TestCase):
+    def test_tokens(self):
+        tokens = list(tokenize('foo\n7:00\n\nbar baz\n08:30'))
+        self.assertEqual(len(tokens), 2)
+        self.assertEqual((tokens[0].title, tokens[0].hour, tokens[0].minute, tokens[0].line), ('foo', 7, 0, 1))
+        self.assertEqual((tokens[1].title, tokens[1].hour, tokens[1].minute, tokens[1].line), ('bar baz', 8, 30, 4))
+
+    def test_tolerates_whitespace(self):
+        text = '\r\n\r\n  foo \r\n7:00  \r\n\r\n\r\n\t\r\nbar\r\n8:00\r\n\r\n'
+        tokens = list(tokenize(text))
+        self.assertEqual([(x.title, x.hour, x.line) for x in tokens], [('foo', 7, 3), ('bar', 8, 8)])
+
+    def test_empty(self):
+        self.assertEqual(list(tokenize('')), [])
+        self.assertEqual(list(tokenize('\n\n  \n')), [])
+
+    def test_error_locations(self):
+        with self.assertRaises(ScheduleSyntaxError) as ctx:
+            list(tokenize('foo\n7:00\n\nbar\n8-00', 'mo.txt'))
+        self.assertEqual((ctx.exception.line, ctx.exception.column), (5, 1))
+        self.assertTrue(str(ctx.exception).startswith('mo.txt:5:1: '))
+
+        with self.assertRaises(ScheduleSyntaxError) as ctx:
+            list(tokenize('foo\n7:00\n\nbar\n  8:x0', 'mo.txt'))
+        self.assertEqual((ctx.exception.line, ctx.exception.column), (5, 5))
+
+        with self.assertRaises(ScheduleSyntaxError) as ctx:
+            list(tokenize('foo\n\n7:00', 'mo.txt'))
+        self.assertEqual((ctx.exception.line, ctx.exception.column), (1, 4))
+
+        with self.assertRaises(ScheduleSyntaxError) as ctx:
+            list(tokenize('foo\n7:00\n\nbar', 'mo.txt'))
+        self.assertEqual(ctx.exception.line, 4)
+
+    def test_ranges(self):
+        with self.assertRaises(ScheduleSyntaxError):
+            list(tokenize('foo\n24:00'))
+
+        with self.assertRaises(ScheduleSyntaxError):
+            list(tokenize('foo\n7:60'))
+
+        with self.assertRaises(ScheduleSyntaxError):
+            list(tokenize('foo\n7:000'))
+
+    def test_columns(self):
+        for text in ('foo\n7:00\n\nbar\n8:00-8:30', '\r\n foo\r\n7:00\r\n\r\n\r\nbar\r\n8:00\r\n', ''):
+            self.assertEqual(list(zip(*tokenize_columns(text))), [tuple(x) for x in tokenize(text)])
+
+    def test_end_times(self):
+        tokens = list(tokenize('foo\n9:00-9:25\n\nbar\n23:00 - 24:00'))
+        self.assertEqual([(x.hour, x.minute, x.duration) for x in tokens], [(9, 0, 25), (23, 0, 60)])
+
+        with self.assertRaises(ScheduleSyntaxError) as ctx:
+            list(tokenize('foo\n9:00-8:00'))
+        self.assertIn('is not after the start time', str(ctx.exception))
+
+        with self.assertRaises(ScheduleSyntaxError) as ctx:
+            list(tokenize('foo\n23:00-24:30'))
+        self.assertIn('is past the end of the day', str(ctx.exception))
+        self.assertEqual((ctx.exception.line, ctx.exception.column), (2, 7))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,188 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from podap.config import Config
+from podap.model import Model, Watcher, DayOfWeek
+from podap.model.watcher import Debouncer
+
+EXAMPLE_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'example')
+
+
+class DebouncerTestCase(unittest.TestCase):
+    @staticmethod
+    def make_callback(calls: list):
+        done = threading.Semaphore(0)
+
+        def callback(count):
+            calls.append(count)
+            done.release()
+
+        return callback, done
+
+    def test_burst_is_folded(self):
+        calls = []
+        callback, done = self.make_callback(calls)
+        debouncer = Debouncer(0.05, callback)
+        self.addCleanup(debouncer.cancel)
+        for _ in range(10):
+            debouncer.trigger()
+        self.assertTrue(done.acquire(timeout=2.0))
+
+        # A later trigger is a burst of its own, served by the same thread
+        thread = debouncer.thread
+        debouncer.trigger()
+        self.assertTrue(done.acquire(timeout=2.0))
+        self.assertEqual(calls, [10, 1])
+        self.assertIs(debouncer.thread, thread)
+
+    def test_cancel(self):
+        calls = []
+        callback, done = self.make_callback(calls)
+        debouncer = Debouncer(0.05, callback)
+        debouncer.trigger()
+        thread = debouncer.thread
+        debouncer.cancel()
+        thread.join(2.0)
+        self.assertFalse(thread.is_alive())
+
+        # Usable again after being cancelled, without any of the cancelled triggers
+        debouncer.trigger()
+        self.assertTrue(done.acquire(timeout=2.0))
+        debouncer.cancel()
+        self.assertEqual(calls, [1])
+
+
+class WatcherTestCase(unittest.TestCase):
+    def setUp(self):
+        self.working_directory = tempfile.mkdtemp()
+        for name in os.listdir(EXAMPLE_DIR):
+            shutil.copy(os.path.join(EXAMPLE_DIR, name), self.working_directory)
+
+        Config.INSTANCE = Config(working_directory=self.working_directory, pause_duration=15, pause_text='PAUSE',
+                                 borderless=False, reload_delay=100)
+
+    def tearDown(self):
+        shutil.rmtree(self.working_directory)
+        Config.INSTANCE = None
+
+    @staticmethod
+    def wait_for_title(model: Model, title: str):
+        """ Event set once the reload of the model (running in the background) brings the given Monday title """
+        loaded = threading.Event()
+
+        def on_change(*_):
+            if model.get_for_day_and_time(DayOfWeek.Monday, 0, 0).title == title:
+                loaded.set()
+
+        model.subscribe_to_changes(on_change)
+        return loaded
+
+    def test_editor_save_is_a_single_reload(self):
+        model = Model()
+        watcher = Watcher(model)
+        reloads = []
+        reloaded = threading.Semaphore(0)
+        watcher.subscribe_to_reloads(lambda x: (reloads.append(x), reloaded.release()))
+
+        with watcher:
+            # Write a temporary file and rename it over the original one, like many editors do
+            loaded = self.wait_for_title(model, 'foo')
+            path = os.path.join(self.working_directory, '0_mo.txt')
+            temp_path = path + '.tmp'
+            with open(temp_path, 'w') as f:
+                f.write('foo\n0:00')
+            os.replace(temp_path, path)
+            os.utime(path)
+            self.assertTrue(loaded.wait(5.0))
+
+            # The next save is a reload of its own, so any leftovers of the first one would have shown up before it
+            loaded = self.wait_for_title(model, 'bar')
+            with open(path, 'w') as f:
+                f.write('bar\n0:00')
+            self.assertTrue(loaded.wait(5.0))
+
+        # The model may be reloaded before the listeners are called
+        self.assertTrue(reloaded.acquire(timeout=5.0) and reloaded.acquire(timeout=5.0))
+        self.assertEqual(len(reloads), 2)
+        self.assertGreaterEqual(reloads[0], 1)
+
+    def test_polling_backend(self):
+        Config.INSTANCE.watcher_backend = Config.WATCHER_POLLING
+        Config.INSTANCE.poll_interval = 50
+
+        model = Model()
+        watcher = Watcher(model)
+        reloads = []
+        reloaded = threading.Semaphore(0)
+        watcher.subscribe_to_reloads(lambda x: (reloads.append(x), reloaded.release()))
+
+        with watcher:
+            # Temporary files are not reported, neither together with the schedule file nor on their own
+            loaded = self.wait_for_title(model, 'foo')
+            with open(os.path.join(self.working_directory, '0_mo.txt.swp'), 'w') as f:
+                f.write('swap')
+            with open(os.path.join(self.working_directory, '0_mo.txt'), 'w') as f:
+                f.write('foo\n0:00')
+            self.assertTrue(loaded.wait(5.0))
+
+            # The model may be reloaded before the listeners are called
+            self.assertTrue(reloaded.acquire(timeout=5.0))
+            self.assertGreaterEqual(reloads[0], 1)
+
+            # Several poll intervals without any changes: the temporary file must not cause a reload of its own
+            self.assertFalse(reloaded.acquire(timeout=0.5))
+
+        self.assertEqual(len(reloads), 1)
+
+    def test_shared_observer(self):
+        other_directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, other_directory)
+        for name in os.listdir(EXAMPLE_DIR):
+            shutil.copy(os.path.join(EXAMPLE_DIR, name), other_directory)
+
+        models = [Model(), Model(working_directory=other_directory)]
+        watchers = [Watcher(x) for x in models]
+        done = [threading.Event() for _ in models]
+        for model, event in zip(models, done):
+            model.subscribe_to_changes(lambda _, __, e=event: e.set())
+
+        with watchers[0], watchers[1]:
+            self.assertIs(watchers[0].observer, watchers[1].observer)
+            observer = watchers[0].observer
+
+            for directory in (self.working_directory, other_directory):
+                with open(os.path.join(directory, '0_mo.txt'), 'w') as f:
+                    f.write(f'{os.path.basename(directory)}\n0:00')
+
+            self.assertTrue(done[0].wait(5.0))
+            self.assertTrue(done[1].wait(5.0))
+
+        # Stopped along with the last watcher
+        self.assertFalse(observer.is_alive())
+        self.assertEqual(Watcher._observers, {})
+
+        for model, directory in zip(models, (self.working_directory, other_directory)):
+            self.assertEqual(model.get_for_day_and_time(DayOfWeek.Monday, 0, 0).title, os.path.basename(directory))
+
+    def test_multiple_directories_are_polled(self):
+        self.assertEqual(Watcher.get_backend(), Config.WATCHER_NATIVE)
+
+        Config.INSTANCE.working_directories = [self.working_directory, EXAMPLE_DIR]
+        self.assertEqual(Watcher(Model()).backend, Config.WATCHER_POLLING)
+
+        # An explicit choice is never overridden
+        Config.INSTANCE.watcher_backend = Config.WATCHER_NATIVE
+        self.assertEqual(Watcher.get_backend(), Config.WATCHER_NATIVE)
+
+    def test_schedule_file_names(self):
+        self.assertTrue(Watcher.is_schedule_file('0_mo.txt'))
+        self.assertTrue(Watcher.is_schedule_file('2024-12-24_eve.txt'))
+        for name in ('.0_mo.txt.swp', '0_mo.txt~', '.#0_mo.txt', '#0_mo.txt#', '4913', '0_mo.txt.tmp', 'notes.md'):
+            self.assertFalse(Watcher.is_schedule_file(name), name)
+
+
+if __name__ == '__main__':
+    unittest.main()
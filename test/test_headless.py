@@ -0,0 +1,60 @@
+import io
+import json
+import os
+import queue
+import subprocess
+import sys
+import unittest
+from datetime import datetime
+
+from podap.config import Config
+from podap.headless import HeadlessApp
+from podap.model import Model
+
+EXAMPLE_DIR = os.path.join(os.path.dirname(__file__), '..', 'example')
+
+
+class HeadlessTestCase(unittest.TestCase):
+    def setUp(self):
+        Config.INSTANCE = Config(working_directory=EXAMPLE_DIR, pause_duration=15, pause_text='PAUSE',
+                                 borderless=False)
+        self.notifications = queue.Queue()
+        self.model = Model(dispatcher=self.notifications.put, load=False)
+        self.output = io.StringIO()
+        self.app = HeadlessApp(self.model, self.notifications, self.output)
+
+    def tearDown(self):
+        Config.INSTANCE = None
+
+    def lines(self):
+        return [json.loads(x) for x in self.output.getvalue().splitlines()]
+
+    def test_transitions(self):
+        # Nothing to report until loaded
+        self.app.update(datetime(2022, 6, 6, 9, 10))
+        self.assertEqual(self.lines(), [])
+
+        # Note: the change notification is not delivered, it would print the state as of now
+        self.model.reload()
+        self.app.update(datetime(2022, 6, 6, 9, 10))
+        self.app.update(datetime(2022, 6, 6, 9, 45))
+
+        lines = self.lines()
+        self.assertEqual(lines[0], {'time': '2022-06-06T09:10:00', 'current': 'Work', 'next': 'Work', 'pause': False,
+                                    'remaining': 35 * 60})
+        self.assertEqual(lines[1], {'time': '2022-06-06T09:45:00', 'current': 'PAUSE', 'next': 'Work', 'pause': True,
+                                    'remaining': 15 * 60})
+
+        # Same state, nothing new to report
+        self.app.update(datetime(2022, 6, 6, 9, 50))
+        self.assertEqual(len(self.lines()), 2)
+
+    def test_does_not_import_gui(self):
+        code = 'import sys, podap.cli, podap.headless, podap.model.watcher; print("PySide6" in sys.modules)'
+        result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                                cwd=os.path.join(os.path.dirname(__file__), '..'))
+        self.assertEqual(result.stdout.strip(), 'False')
+
+
+if __name__ == '__main__':
+    unittest.main()
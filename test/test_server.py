@@ -0,0 +1,82 @@
+import os
+import json
+import socket
+import tempfile
+import unittest
+from datetime import datetime
+
+from podap.config import Config
+from podap.model import Model
+from podap.server import QueryServer
+
+EXAMPLE_DIR = os.path.join(os.path.dirname(__file__), '..', 'example')
+
+
+class QueryServerTestCase(unittest.TestCase):
+    def setUp(self):
+        Config.INSTANCE = Config(working_directory=EXAMPLE_DIR, pause_duration=15, pause_text='PAUSE',
+                                 borderless=False)
+        self.model = Model()
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'podap.sock')
+        self.server = QueryServer(self.model, self.path)
+
+    def tearDown(self):
+        self.directory.cleanup()
+        Config.INSTANCE = None
+
+    def test_handle(self):
+        monday = datetime(2022, 6, 6, 9, 10)
+        self.assertEqual(self.server.handle('current', monday), {'title': 'Work', 'pause': False, 'remaining': 35 * 60})
+        self.assertEqual(self.server.handle('next', monday.replace(minute=50)), {'title': 'Work'})
+
+        day = self.server.handle('day', monday)
+        self.assertEqual(day['entries'][day['active']], {'start': '09:00', 'duration': 60, 'title': 'Work'})
+
+        self.assertEqual(self.server.handle('hash', monday), {'hash': self.model.schedule.content_hash})
+        self.assertIn('error', self.server.handle('foo', monday))
+
+    def test_schedule_hash(self):
+        # Same contents give the same hash
+        self.assertEqual(Model().schedule.content_hash, self.model.schedule.content_hash)
+
+    def test_socket(self):
+        self.server.start()
+        self.assertEqual(os.stat(self.path).st_mode & 0o777, 0o600)
+
+        # Another instance can't take over the socket
+        with self.assertRaises(OSError):
+            QueryServer(self.model, self.path).start()
+
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+            s.connect(self.path)
+            f = s.makefile('rwb')
+            for command in (b'hash\n', b'current\n', b'bar\n'):
+                f.write(command)
+                f.flush()
+                self.assertIsInstance(json.loads(f.readline()), dict)
+
+            # Too long requests are refused, and the connection is closed
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as other:
+                other.connect(self.path)
+                g = other.makefile('rwb')
+                g.write(b'x' * 3 * QueryServer.MAX_REQUEST_SIZE + b'\ncurrent\n')
+                g.flush()
+                self.assertIn('error', json.loads(g.readline()))
+                self.assertEqual(g.readline(), b'')
+
+            # Connected clients don't keep the server from stopping
+            self.server.stop()
+            self.assertEqual(f.readline(), b'')
+
+        self.assertFalse(os.path.exists(self.path))
+
+        # A socket left behind is taken over
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+            s.bind(self.path)
+        with self.server:
+            self.assertTrue(os.path.exists(self.path))
+
+
+if __name__ == '__main__':
+    unittest.main()
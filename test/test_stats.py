@@ -0,0 +1,51 @@
+import json
+import os
+import tempfile
+import unittest
+
+from podap.stats import Histogram, Stats
+
+
+class StatsTestCase(unittest.TestCase):
+    def test_disabled(self):
+        stats = Stats()
+        stats.count('foo')
+        stats.observe('bar', 1.0)
+        with stats.timer('baz'):
+            pass
+
+        self.assertEqual(stats.counters, {})
+        self.assertEqual(stats.histograms, {})
+
+    def test_enabled(self):
+        stats = Stats(enabled=True)
+        stats.count('foo')
+        stats.count('foo', 2)
+        with stats.timer('baz'):
+            pass
+
+        data = stats.to_dict()
+        self.assertEqual(data['counters'], {'foo': 3})
+        self.assertEqual(data['histograms']['baz']['count'], 1)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'stats.json')
+            stats.dump(path)
+            with open(path) as f:
+                self.assertEqual(json.load(f)['counters'], {'foo': 3})
+
+    def test_histogram(self):
+        histogram = Histogram()
+        for x in [0.5, 3, 3, 3, 100]:
+            histogram.observe(x)
+
+        self.assertEqual(histogram.count, 5)
+        self.assertEqual(histogram.min, 0.5)
+        self.assertEqual(histogram.max, 100)
+        self.assertEqual(histogram.buckets, [1, 0, 3, 0, 0, 0, 0, 1])
+        self.assertEqual(histogram.percentile(0.5), 4)
+        self.assertEqual(histogram.percentile(1.0), 100)
+
+
+if __name__ == '__main__':
+    unittest.main()
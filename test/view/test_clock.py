@@ -0,0 +1,54 @@
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+
+from PySide6.QtCore import QCoreApplication
+
+from podap.config import Config
+from podap.model import Model
+from podap.view.clock import Clock
+
+
+class ClockTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = QCoreApplication.instance() or QCoreApplication([])
+
+        # A new entry every minute of every day, and no breaks
+        self.working_directory = tempfile.mkdtemp()
+        text = '\n\n'.join(f'Task {x}\n{x // 60}:{x % 60:02}' for x in range(24 * 60))
+        for day in range(7):
+            with open(os.path.join(self.working_directory, f'{day}_day.txt'), 'w') as f:
+                f.write(text)
+
+        Config.INSTANCE = Config(working_directory=self.working_directory, pause_duration=0, pause_text='PAUSE',
+                                 borderless=False)
+
+    def tearDown(self):
+        shutil.rmtree(self.working_directory)
+        Config.INSTANCE = None
+
+    def test_rearmed_on_model_change(self):
+        model = Model(load=False)
+        clock = Clock(model)
+        # Only capped by the end of the day (and the maximum interval), without any entries
+        self.assertGreater(clock.transition_timer.interval(), 0)
+        self.assertLessEqual(clock.transition_timer.interval(), Clock.MAX_INTERVAL_MS)
+
+        # The entry boundaries are only known once the schedule is loaded
+        model.reload()
+        self.assertLessEqual(clock.transition_timer.interval(), 60 * 1000 + Clock.SLACK_MS)
+
+    def test_minute_marks(self):
+        clock = Clock(Model(load=False))
+        clock.add_minute_marks([45, 23 * 60])
+        self.assertEqual(clock.minute_marks, [45, 23 * 60])
+
+        self.assertEqual(clock._next_minute_mark(datetime(2024, 6, 3, 0, 30)), datetime(2024, 6, 3, 0, 45))
+        self.assertEqual(clock._next_minute_mark(datetime(2024, 6, 3, 0, 45)), datetime(2024, 6, 3, 23, 0))
+        self.assertEqual(clock._next_minute_mark(datetime(2024, 6, 3, 23, 0, 1)), datetime(2024, 6, 4, 0, 45))
+
+
+if __name__ == '__main__':
+    unittest.main()